@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib import admin
-from .models import User, ResumeProfile, JobPost, Proposal, Message, MessageThread,ChatRoom
+from .models import User, ResumeProfile, JobPost, Proposal, Message, MessageThread,ChatRoom, ScoringJob, Skill, ChatReadMarker
 
 # Register your models here.
 
@@ -11,3 +11,6 @@ admin.site.register(Proposal)
 admin.site.register(Message)
 admin.site.register(MessageThread)
 admin.site.register(ChatRoom)
+admin.site.register(ScoringJob)
+admin.site.register(Skill)
+admin.site.register(ChatReadMarker)
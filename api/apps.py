@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import install_search_index
+        post_migrate.connect(install_search_index, sender=self)
+
+        # ✅ Load the NLP model once in the master process (see gunicorn.conf.py)
+        if settings.NLP_PRELOAD:
+            from .nlp import preload_nlp
+            preload_nlp()
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+# -----------------------------
+# JWT authentication without a per-request User query
+# -----------------------------
+# Access tokens carry role/email/username claims (CustomTokenObtainPairSerializer),
+# which is all the read-only list views need from request.user: they filter
+# and compare by id and check the role. Profile fields (full_name, bio...)
+# are NOT filled in, so views that render or change the user keep the default
+# JWTAuthentication. Claims are as fresh as the token (ACCESS_TOKEN_LIFETIME);
+# tokens issued without them fall back to a short-lived cache of the row.
+# Nothing here sees is_active, so a deactivated account keeps these reads
+# until its token expires: views that show proposals, candidates or chats
+# (other people's data) keep JWTAuthentication, which rejects it at once.
+CLAIM_FIELDS = ('email', 'username', 'role')
+
+
+def token_user_id(validated_token):
+    # SimpleJWT stores the id as a string
+    return User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def user_from_claims(validated_token):
+    """A User built from the token's claims, or None if the token predates them."""
+    if any(field not in validated_token for field in CLAIM_FIELDS):
+        return None
+    user = User(
+        id=token_user_id(validated_token),
+        **{field: validated_token[field] for field in CLAIM_FIELDS},
+    )
+    # Behaves like a row loaded from the database (comparisons, FK filters)
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    For GET/HEAD/OPTIONS, builds request.user from the token instead of
+    loading it; other methods authenticate exactly like JWTAuthentication.
+    """
+
+    def authenticate(self, request):
+        self.read_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if not self.read_only:
+            return super().get_user(validated_token)
+
+        user = user_from_claims(validated_token)
+        if user is not None:
+            return user
+
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = user_cache_key(token_user_id(validated_token))
+        user = cache.get(key)
+        if user is None:
+            # Also rejects missing and inactive users
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
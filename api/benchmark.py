@@ -0,0 +1,219 @@
+import gc
+import math
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import ChatRoom, JobPost, Message, Proposal, ResumeProfile, User
+from .serializers import CustomTokenObtainPairSerializer
+
+
+# Vocabulary of the synthetic datasets (seed_benchmark_data, benchmark_matching)
+SKILLS = [
+    'python', 'django', 'flask', 'fastapi', 'javascript', 'typescript', 'react', 'vue', 'angular', 'node.js',
+    'html', 'css', 'tailwind', 'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'docker', 'kubernetes',
+    'aws', 'gcp', 'azure', 'terraform', 'linux', 'git', 'rest api', 'graphql', 'java', 'spring',
+    'kotlin', 'android', 'swift', 'ios', 'flutter', 'dart', 'php', 'laravel', 'ruby', 'rails',
+    'go', 'rust', 'c#', '.net', 'machine learning', 'data analysis', 'pandas', 'numpy', 'tensorflow', 'pytorch',
+    'figma', 'ui design', 'ux research', 'seo', 'copywriting', 'project management', 'scrum', 'excel',
+    'power bi', 'tableau',
+]
+WORDS = (
+    "build maintain design ship scale integrate migrate test deploy review platform dashboard "
+    "marketplace payments mobile backend frontend pipeline analytics startup team product api "
+    "customers reports automation cloud service data feature release performance security"
+).split()
+
+
+# -----------------------------
+# In-process API benchmarks
+# -----------------------------
+# Each scenario is one GET against the URLconf, issued serially through the
+# full middleware/DRF stack (no network, no server). Results are keyed by
+# scenario name, so JSON reports from two commits on the same seeded
+# dataset (see `manage.py seed_benchmark_data`) can be compared directly.
+class Scenario:
+    def __init__(self, name, path, user=None):
+        self.name = name
+        self.path = path
+        self.user = user
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def build_scenarios():
+    """Scenarios for the main read endpoints, aimed at the busiest rows of the current dataset."""
+    job = JobPost.objects.filter(status='Open').order_by('-proposal_count', 'id').first()
+    if job is None:
+        raise LookupError("No open jobs: seed the database first (manage.py seed_benchmark_data).")
+    employer = job.employer
+    freelancer = (
+        User.objects.filter(role='freelancer', resume__isnull=False)
+        .annotate(proposal_total=Count('proposals')).order_by('-proposal_total', 'id').first()
+    )
+    room = ChatRoom.objects.annotate(message_total=Count('messages')).order_by('-message_total', 'id').first()
+    skill = job.required_skills.split(',')[0].strip()
+
+    scenarios = [
+        Scenario('jobs_anonymous', '/api/v1/jobs/'),
+        Scenario('jobs', '/api/v1/jobs/', freelancer),
+        Scenario('jobs_keyset', '/api/v1/jobs/?cursor=', freelancer),
+        Scenario('jobs_search', f'/api/v1/jobs/?search={skill}', freelancer),
+        Scenario('jobs_by_skill', f'/api/v1/jobs/?skill={skill}', freelancer),
+        Scenario('employer_jobs', f'/api/v1/jobs/employer/{employer.pk}/'),
+        Scenario('job_detail', f'/api/v1/jobs/{job.pk}/', freelancer),
+        Scenario('jobs_recommended', '/api/v1/jobs/recommended/', freelancer),
+        Scenario('has_applied', f'/api/v1/jobs/{job.pk}/has-applied/', freelancer),
+        Scenario('job_proposals', f'/api/v1/jobs/{job.pk}/proposals/', employer),
+        Scenario('job_proposals_export', f'/api/v1/jobs/{job.pk}/proposals/export.csv', employer),
+        Scenario('job_candidates', f'/api/v1/jobs/{job.pk}/candidates/', employer),
+        Scenario('freelancer_proposals', '/api/v1/proposals/freelancer/', freelancer),
+        Scenario('profile', '/api/v1/profile/', freelancer),
+        Scenario('resume', '/api/v1/resume/', freelancer),
+    ]
+    if room is not None:
+        scenarios += [
+            Scenario('chat_rooms', '/api/v1/chat/rooms/', room.employer),
+            Scenario('chat_messages', f'/api/v1/chat/rooms/{room.pk}/messages/?cursor=', room.employer),
+        ]
+    return scenarios
+
+
+def run_scenario(scenario, iterations, warmup):
+    client = APIClient()
+    if scenario.user is not None:
+        # A real access token, so authentication is part of what's measured
+        token = CustomTokenObtainPairSerializer.get_token(scenario.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    for _ in range(warmup):
+        consume(client.get(scenario.path))
+
+    latencies, queries = [], []
+    errors = size = 0
+    status = None
+    # Like timeit: collections would land on random requests and blur the percentiles
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = client.get(scenario.path)
+                body = consume(response)
+                latencies.append((time.perf_counter() - request_started) * 1000)
+            queries.append(len(captured))
+            status = response.status_code
+            errors += status >= 400
+            size = len(body)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    latencies.sort()
+    return {
+        'path': scenario.path,
+        'status': status,
+        'requests': iterations,
+        'errors': errors,
+        'throughput_rps': round(iterations / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries': {'mean': round(sum(queries) / len(queries), 2), 'max': max(queries)},
+        'response_bytes': size,
+    }
+
+
+def consume(response):
+    # Streaming responses only do their work (and their queries) when read
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_summary():
+    return {
+        'users': User.objects.count(),
+        'resumes': ResumeProfile.objects.count(),
+        'jobs': JobPost.objects.count(),
+        'proposals': Proposal.objects.count(),
+        'chat_rooms': ChatRoom.objects.count(),
+        'messages': Message.objects.count(),
+    }
+
+
+def run_benchmarks(scenarios, iterations, warmup, progress=None):
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, iterations, warmup)
+        if progress is not None:
+            progress(scenario.name, results[scenario.name])
+    return {
+        'meta': {
+            'commit': current_commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'warmup': warmup,
+            'dataset': dataset_summary(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline, threshold, min_delta_ms=1.0):
+    """
+    Regressions of `report` against `baseline`: any scenario that started
+    failing, whose query count grew at all, or whose median latency grew by
+    more than `threshold` (0.25 = 25%) and at least `min_delta_ms`. The
+    median is gated rather than p95/p99, which swing too much between runs
+    of a few dozen requests to fail a build on.
+    """
+    regressions = []
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        if result['errors'] > before['errors']:
+            regressions.append(f"{name}: {result['errors']} errors (was {before['errors']})")
+        if result['queries']['max'] > before['queries']['max']:
+            regressions.append(f"{name}: {result['queries']['max']} queries (was {before['queries']['max']})")
+        old_p50, new_p50 = before['latency_ms']['p50'], result['latency_ms']['p50']
+        if old_p50 and new_p50 > old_p50 * (1 + threshold) and new_p50 - old_p50 >= min_delta_ms:
+            regressions.append(f"{name}: p50 {new_p50:.1f}ms (was {old_p50:.1f}ms, +{new_p50 / old_p50 - 1:.0%})")
+    if report['meta']['dataset'] != baseline.get('meta', {}).get('dataset'):
+        regressions.append("dataset differs from the baseline's; results are not comparable")
+    return regressions
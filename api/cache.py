@@ -0,0 +1,93 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+# -----------------------------
+# Versioned response cache
+# -----------------------------
+# Cached responses are keyed by a version counter that is bumped whenever the
+# underlying data changes (see api/signals.py), so a bump makes every older
+# entry unreachable at once: no TTL guessing. The counter lives in the same
+# cache as the responses, so a hit costs no database query; that cache must
+# be shared by every process that serves or changes the data (see CACHES in
+# settings). Bumps run when the transaction commits, so a request that reads
+# between the write and the commit can't cache the old rows under the new
+# version.
+def version_key(name):
+    return f"version:{name}"
+
+
+def new_version():
+    # A counter that was never set, or was evicted, restarts from a value no
+    # earlier entry can have been stored under
+    return time.time_ns()
+
+
+def get_version(name):
+    cache = caches[settings.RESPONSE_CACHE_ALIAS]
+    version = cache.get(version_key(name))
+    if version is None:
+        cache.add(version_key(name), new_version(), None)
+        version = cache.get(version_key(name), 0)
+    return version
+
+
+def bump_version(name):
+    def bump():
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        try:
+            cache.incr(version_key(name))
+        except ValueError:
+            cache.add(version_key(name), new_version(), None)
+
+    transaction.on_commit(bump)
+
+
+class VersionedResponseCacheMixin:
+    """
+    Caches the data of anonymous GET responses under
+    `<cache_namespace>:<version>:<view>:<query>` in settings.RESPONSE_CACHE_ALIAS,
+    for `cache_timeout` seconds (settings.RESPONSE_CACHE_TIMEOUT if None).
+    Values that change without a version bump are refreshed on every hit by
+    `overlay_cached_data`.
+    """
+    cache_namespace = None
+    cache_timeout = None
+
+    def get_response_cache_key(self, request):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return None
+        if getattr(request.accepted_renderer, 'format', None) != 'json':
+            return None
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+        return f"{self.cache_namespace}:{get_version(self.cache_namespace)}:{type(self).__name__}:{digest}"
+
+    def overlay_cached_data(self, data):
+        """Hook: bring the live parts of a cached response's data up to date."""
+        return data
+
+    def get(self, request, *args, **kwargs):
+        self.response_cache_key = self.get_response_cache_key(request)
+        if self.response_cache_key is not None:
+            cached = caches[settings.RESPONSE_CACHE_ALIAS].get(self.response_cache_key)
+            if cached is not None:
+                self.response_cache_key = None  # served from the cache: don't store it again
+                return Response(self.overlay_cached_data(cached), headers={'X-Cache': 'HIT'})
+        return super().get(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key is not None and isinstance(response, Response) and response.status_code == 200:
+            caches[settings.RESPONSE_CACHE_ALIAS].set(
+                key, response.data, self.cache_timeout or settings.RESPONSE_CACHE_TIMEOUT,
+            )
+            response['X-Cache'] = 'MISS'
+        return response
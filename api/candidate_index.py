@@ -0,0 +1,174 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .models import ResumeProfile
+
+
+# -----------------------------
+# Vectorized resume × skill matrix for candidate search
+# -----------------------------
+class MatrixSnapshot:
+    """
+    One compiled state of the matrix. Never modified once built: changes
+    produce a new snapshot, so a request ranks against a consistent set of
+    arrays however many syncs happen in other threads meanwhile.
+    """
+
+    def __init__(self, vocab, user_ids, rows, indices, nnz_rows, active, overlay):
+        self.vocab = vocab          # token -> column
+        self.user_ids = user_ids    # row -> freelancer id
+        self.rows = rows            # freelancer id -> row
+        self.indices = indices      # column of each non-zero
+        self.nnz_rows = nnz_rows    # row of each non-zero
+        self.active = active        # rows not superseded by the overlay
+        self.overlay = overlay      # freelancer id -> token set
+
+    @classmethod
+    def compile(cls, items):
+        vocab = {}
+        user_ids, indices, lengths = [], [], []
+        for user_id, tokens in items:
+            columns = [vocab.setdefault(token, len(vocab)) for token in tokens]
+            user_ids.append(user_id)
+            indices.extend(columns)
+            lengths.append(len(columns))
+
+        return cls(
+            vocab=vocab,
+            user_ids=np.array(user_ids, dtype=np.int64),
+            rows={user_id: row for row, user_id in enumerate(user_ids)},
+            indices=np.array(indices, dtype=np.int32),
+            nnz_rows=np.repeat(np.arange(len(user_ids), dtype=np.int32), lengths),
+            active=np.ones(len(user_ids), dtype=bool),
+            overlay={},
+        )
+
+    def replace(self, discard=(), overlay=None):
+        """A copy with the `discard` freelancers' rows masked out and `overlay` entries added."""
+        active = self.active.copy()
+        merged = dict(self.overlay)
+        for user_id in discard:
+            row = self.rows.get(user_id)
+            if row is not None:
+                active[row] = False
+            merged.pop(user_id, None)
+        merged.update(overlay or {})
+        return MatrixSnapshot(self.vocab, self.user_ids, self.rows, self.indices, self.nnz_rows, active, merged)
+
+    def rank(self, skills):
+        if not skills:
+            return np.empty(0, np.int64), np.empty(0)
+
+        mask = np.zeros(len(self.vocab), dtype=bool)
+        mask[[self.vocab[s] for s in skills if s in self.vocab]] = True
+        hits = np.bincount(self.nnz_rows[mask[self.indices]], minlength=len(self.user_ids))
+        hits[~self.active] = 0
+        rows = np.flatnonzero(hits)
+
+        extra = [(user_id, len(skills & tokens)) for user_id, tokens in self.overlay.items()]
+        extra = [(user_id, count) for user_id, count in extra if count]
+
+        user_ids = np.concatenate([self.user_ids[rows], np.array([u for u, _ in extra], dtype=np.int64)])
+        counts = np.concatenate([hits[rows], np.array([c for _, c in extra], dtype=np.int64)])
+        scores = np.round(counts * (100 / len(skills)), 2)
+
+        # Highest score first, then lowest freelancer id for a stable order
+        order = np.lexsort((user_ids, -scores))
+        return user_ids[order], scores[order]
+
+
+class ResumeMatrix:
+    """
+    Per-process sparse (CSR-style) matrix of every freelancer's stored
+    skill_tokens: one row per resume, one column per distinct token.
+    Scoring a job against all resumes is a column mask plus a bincount over
+    the non-zeros, with no Python loop over users.
+
+    Resumes edited after the matrix was compiled live in a small overlay
+    (scored in Python) and their base rows are masked out; once the overlay
+    grows past COMPACT_THRESHOLD the matrix is recompiled. Every change
+    swaps in a new MatrixSnapshot under the lock; readers never lock.
+    """
+
+    COMPACT_THRESHOLD = 1000
+    # See OpenJobIndex.SYNC_OVERLAP
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.snapshot = MatrixSnapshot.compile([])
+        self.synced_at = None
+
+    def _profiles(self):
+        return ResumeProfile.objects.filter(user__role='freelancer')
+
+    def sync(self):
+        """Bring the matrix up to date and return the current snapshot."""
+        with self._lock:
+            if self.synced_at is None or len(self.snapshot.overlay) > self.COMPACT_THRESHOLD:
+                self._rebuild()
+            else:
+                self._apply_changes()
+            return self.snapshot
+
+    def _rebuild(self):
+        marker = timezone.now()
+        self.snapshot = MatrixSnapshot.compile(
+            self._profiles().values_list('user_id', 'skill_tokens').iterator(chunk_size=5000)
+        )
+        self.synced_at = marker
+
+    def _apply_changes(self):
+        marker = timezone.now()
+        changed = list(
+            ResumeProfile.objects.filter(updated_at__gte=self.synced_at - self.SYNC_OVERLAP)
+            .values_list('user_id', 'user__role', 'skill_tokens')
+        )
+        self.synced_at = marker
+        if not changed:
+            return
+        self.snapshot = self.snapshot.replace(
+            discard=[user_id for user_id, _, _ in changed],
+            overlay={user_id: set(tokens) for user_id, role, tokens in changed if role == 'freelancer'},
+        )
+
+    def discard(self, user_ids):
+        """Forget these freelancers (e.g. resumes deleted since the last sync)."""
+        with self._lock:
+            self.snapshot = self.snapshot.replace(discard=user_ids)
+
+    def rank(self, skills):
+        """
+        Return (freelancer ids, scores) for every resume matching at least one
+        of `skills`, best first. Scores use the proposal formula.
+        """
+        return self.sync().rank(skills)
+
+
+resume_matrix = ResumeMatrix()
+
+
+class RankedCandidates:
+    """Sequence of (freelancer id, score) pairs that DRF paginators can slice."""
+
+    def __init__(self, user_ids, scores):
+        self.user_ids = user_ids
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.user_ids[index].tolist(), self.scores[index].tolist()))
+        return int(self.user_ids[index]), float(self.scores[index])
+
+
+def rank_candidates(skills):
+    return RankedCandidates(*resume_matrix.rank(skills))
@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Left
+from django.utils import timezone
+
+from .models import ChatReadMarker, Message
+from .serializers import MessageSerializer
+
+
+# -----------------------------
+# New-message notifications (long-polling and WebSocket clients)
+# -----------------------------
+# Long-poll waiters block on a process-local condition so a message posted
+# through this process wakes them at once; they also re-check the database
+# every POLL_INTERVAL seconds to see messages posted through other workers.
+# WebSocket clients get the message pushed through the channel layer
+# (CHANNEL_LAYERS in settings), which reaches other processes only when a
+# shared layer such as Redis is configured.
+#
+# Each waiter holds a server thread, so only CHAT_LONG_POLL_SLOTS requests per
+# process may wait at once; the rest are answered straight away (see
+# MessageListCreateView), leaving threads for every other endpoint.
+POLL_INTERVAL = 1.0
+
+_new_message = threading.Condition()
+waiter_slots = threading.BoundedSemaphore(settings.CHAT_LONG_POLL_SLOTS)
+
+
+def room_group(room_id):
+    return f"chat_room_{room_id}"
+
+
+def notify_new_message(message):
+    with _new_message:
+        _new_message.notify_all()
+
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(room_group(message.room_id), {
+            'type': 'chat.message',
+            'message': MessageSerializer(message).data,
+        })
+
+
+def room_state(room_id):
+    """(last message id, message count) — changes whenever the room does."""
+    state = Message.objects.filter(room_id=room_id).aggregate(last=Max('id'), count=Count('id'))
+    return state['last'] or 0, state['count']
+
+
+def room_etag(state, query_string):
+    # The body also depends on the query (after=, cursor=...), so it's part of the tag
+    digest = hashlib.md5(f"{state[0]}:{state[1]}:{query_string}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def wait_for_message(room_id, after_id, timeout):
+    """
+    Block until the room has a message with id > after_id (True), or `timeout`
+    seconds pass (False). Returns None at once when every waiter slot is taken.
+    """
+    if not waiter_slots.acquire(blocking=False):
+        return None
+    try:
+        deadline = time.monotonic() + timeout
+        newer = Message.objects.filter(room_id=room_id, id__gt=after_id)
+        while not newer.exists():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with _new_message:
+                _new_message.wait(timeout=min(remaining, POLL_INTERVAL))
+        return True
+    finally:
+        waiter_slots.release()
+
+
+# -----------------------------
+# Inbox: read markers, last message and unread counts
+# -----------------------------
+PREVIEW_LENGTH = 100
+
+
+def annotate_inbox(rooms, user):
+    """
+    Annotate a ChatRoom queryset, in the same single SQL query, with the
+    latest message (id, sender, preview, timestamp), the user's read marker
+    and how many messages from the other participant came after it; newest
+    activity first.
+    """
+    messages = Message.objects.filter(room=OuterRef('pk'))
+    latest = messages.order_by('-timestamp', '-id')
+    marker = ChatReadMarker.objects.filter(room=OuterRef('pk'), user=user)
+    unread = (
+        messages.filter(id__gt=OuterRef('last_read_message_id')).exclude(sender=user)
+        .order_by().values('room').annotate(count=Count('pk')).values('count')
+    )
+    return (
+        rooms.annotate(
+            last_read_message_id=Coalesce(Subquery(marker.values('last_read_message_id')[:1]), 0),
+            last_message_id=Subquery(latest.values('id')[:1]),
+            last_message_sender=Subquery(latest.values('sender_id')[:1]),
+            last_message_preview=Subquery(latest.annotate(preview=Left('content', PREVIEW_LENGTH)).values('preview')[:1]),
+            last_message_at=Subquery(latest.values('timestamp')[:1]),
+        )
+        .annotate(unread_count=Coalesce(Subquery(unread), 0))
+        .order_by(Coalesce('last_message_at', 'created_at').desc(), '-id')
+    )
+
+
+def mark_room_read(room_id, user, message_id=None):
+    """Move the user's read marker forward to `message_id` (default: the latest message); returns the marker."""
+    last = Message.objects.filter(room_id=room_id).aggregate(last=Max('id'))['last'] or 0
+    # Never past the room's latest message: the marker can't move back, so an id
+    # from the future would hide every message still to come
+    message_id = last if message_id is None else min(message_id, last)
+    marker, created = ChatReadMarker.objects.get_or_create(
+        room_id=room_id, user=user, defaults={'last_read_message_id': message_id},
+    )
+    # Markers only move forward, so a stale client can't mark messages unread again
+    if not created and ChatReadMarker.objects.filter(
+        pk=marker.pk, last_read_message_id__lt=message_id,
+    ).update(last_read_message_id=message_id, updated_at=timezone.now()):
+        marker.last_read_message_id = message_id
+    return marker
@@ -0,0 +1,50 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.db.models import Q
+
+from .chat import notify_new_message, room_group
+from .models import ChatRoom, Message
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    One socket per participant per ChatRoom. Clients send {"content": "..."}
+    and receive every new message in the room as MessageSerializer JSON,
+    including those posted over HTTP.
+    """
+
+    async def connect(self):
+        self.room_id = self.scope['url_route']['kwargs']['room_id']
+        self.user = self.scope['user']
+
+        if not self.user.is_authenticated or not await self.is_participant():
+            await self.close(code=4403)
+            return
+
+        self.group_name = room_group(self.room_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        text = content.get('content') if isinstance(content, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            await self.send_json({'error': 'content is required'})
+            return
+        await self.create_message(text)
+
+    async def chat_message(self, event):
+        await self.send_json(event['message'])
+
+    @database_sync_to_async
+    def is_participant(self):
+        # Same rule as get_or_create_chat_room: the job's employer or the freelancer
+        return ChatRoom.objects.filter(Q(employer=self.user) | Q(freelancer=self.user), pk=self.room_id).exists()
+
+    @database_sync_to_async
+    def create_message(self, text):
+        message = Message.objects.create(room_id=self.room_id, sender=self.user, content=text)
+        notify_new_message(message)
@@ -0,0 +1,96 @@
+import csv
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Proposal
+
+
+# -----------------------------
+# Streaming proposal export (CSV / NDJSON)
+# -----------------------------
+# Rows come straight from one joined query through .iterator(), as tuples
+# rather than model instances, and leave as soon as a batch is encoded, so
+# memory stays flat however many proposals a job has.
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('submitted_at', 'submitted_at'),
+    ('status', 'status'),
+    ('score', 'score'),
+    ('score_status', 'score_status'),
+    ('freelancer_id', 'freelancer_id'),
+    ('username', 'freelancer__username'),
+    ('email', 'freelancer__email'),
+    ('full_name', 'freelancer__full_name'),
+    ('country', 'freelancer__country'),
+    ('skills', 'freelancer__resume__skills'),
+    ('experience', 'freelancer__resume__experience'),
+    ('education', 'freelancer__resume__education'),
+    ('resume_file', 'freelancer__resume__resume_file'),
+    ('cover_letter', 'cover_letter'),
+)
+COLUMN_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+CHUNK_SIZE = 1000  # rows fetched per database round trip
+BATCH_SIZE = 100  # rows per chunk written to the client
+
+
+def proposal_rows(job_id, chunk_size=CHUNK_SIZE):
+    """Yield one dict per proposal of the job (newest first), freelancer and resume fields included."""
+    rows = (
+        Proposal.objects.filter(job_id=job_id)
+        .order_by('-submitted_at', '-id')
+        .values_list(*[path for _, path in EXPORT_COLUMNS])
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        record = dict(zip(COLUMN_NAMES, row))
+        record['submitted_at'] = record['submitted_at'].isoformat()
+        if record['resume_file']:
+            record['resume_file'] = default_storage.url(record['resume_file'])
+        yield record
+
+
+class Echo:
+    """File-like object whose write() hands the line back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def safe_cell(value):
+    # Spreadsheet apps run cells starting with these as formulas; cover letters are user input
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def batched_lines(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= BATCH_SIZE:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def stream_csv(records):
+    writer = csv.writer(Echo())
+    # The header goes out before the first query runs
+    yield writer.writerow(COLUMN_NAMES)
+    yield from batched_lines(
+        writer.writerow([safe_cell(record[name]) for name in COLUMN_NAMES]) for record in records
+    )
+
+
+def stream_ndjson(records):
+    yield from batched_lines(json.dumps(record, cls=DjangoJSONEncoder) + "\n" for record in records)
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,126 @@
+import heapq
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import JobPost
+
+
+# -----------------------------
+# In-memory inverted index of open jobs (skill → job ids)
+# -----------------------------
+class OpenJobIndex:
+    """
+    Per-process index used to rank open jobs against a resume without
+    scanning the catalogue. It is built once from the skill join table, then
+    kept current with a delta query on JobPost.updated_at before each lookup,
+    so jobs opened, closed or edited in any process are picked up.
+    """
+
+    # Re-read jobs touched this recently: skill_tags are written just after
+    # updated_at, so a lookup racing a save could otherwise miss the new tags.
+    # The marker is the read time, so a job drops out of the window once
+    # SYNC_OVERLAP has passed and a quiet table re-reads nothing.
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.postings = defaultdict(set)  # skill name -> {job id}
+        self.job_skills = {}              # job id -> {skill name}
+        self.synced_at = None
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self.synced_at is None:
+            self._rebuild()
+        else:
+            self._apply_changes()
+
+    def _rebuild(self):
+        self.reset()
+        # updated_at is stamped by auto_now, so the marker comes from the same clock
+        marker = timezone.now()
+        self._add_jobs(JobPost.skill_tags.through.objects.filter(jobpost__status='Open'))
+        self.synced_at = marker
+
+    def _apply_changes(self):
+        marker = timezone.now()
+        changed = list(
+            JobPost.objects.filter(updated_at__gte=self.synced_at - self.SYNC_OVERLAP)
+            .values_list('pk', 'status')
+        )
+        self.synced_at = marker
+        if not changed:
+            return
+        for pk, _ in changed:
+            self._remove(pk)
+        open_ids = [pk for pk, status in changed if status == 'Open']
+        self._add_jobs(JobPost.skill_tags.through.objects.filter(jobpost_id__in=open_ids))
+
+    def _add_jobs(self, links):
+        for job_id, skill in links.values_list('jobpost_id', 'skill__name'):
+            self.postings[skill].add(job_id)
+            self.job_skills.setdefault(job_id, set()).add(skill)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id):
+        for skill in self.job_skills.pop(job_id, ()):
+            postings = self.postings[skill]
+            postings.discard(job_id)
+            if not postings:
+                del self.postings[skill]
+
+    def rank(self, tokens):
+        """
+        Yield (job id, score) best-first, where score is the share of the job's
+        required skills found in `tokens` (same formula as the proposal score).
+        Ties go to the newer job (higher id).
+        """
+        # Scores are computed under the lock: another request's sync may rewrite
+        # the postings while this generator is still being consumed
+        with self._lock:
+            self._sync()
+            hits = defaultdict(int)
+            for token in tokens:
+                for job_id in self.postings.get(token, ()):
+                    hits[job_id] += 1
+            heap = [(-count / len(self.job_skills[job_id]), -job_id) for job_id, count in hits.items()]
+
+        heapq.heapify(heap)
+        while heap:
+            score, job_id = heapq.heappop(heap)
+            yield -job_id, round(-score * 100, 2)
+
+
+open_jobs = OpenJobIndex()
+
+
+def recommend_jobs(tokens, limit):
+    """Top `limit` open JobPosts for a resume token set, each with a `match_score`."""
+    results = []
+    ranked = open_jobs.rank(tokens)
+    while len(results) < limit:
+        batch = [item for _, item in zip(range(limit - len(results)), ranked)]
+        if not batch:
+            break
+        jobs = JobPost.objects.filter(pk__in=[pk for pk, _ in batch], status='Open').select_related('employer').in_bulk()
+        for pk, score in batch:
+            job = jobs.get(pk)
+            if job is None:
+                # Deleted since the last sync
+                open_jobs.remove(pk)
+                continue
+            job.match_score = score
+            results.append(job)
+    return results
@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import JobPost, Proposal
+
+
+# -----------------------------
+# Per-job proposal aggregates
+# -----------------------------
+# JobPost.proposal_count / shortlisted_count / scored_count / score_total are
+# moved in place with F() expressions whenever a proposal is created, deleted,
+# changes status or gets (re)scored, so nobody has to count proposal rows to
+# read them. A proposal counts as scored while its score_status is 'done'.
+# Writers that bypass Proposal.save() (queryset.update, bulk_update) call
+# adjust_job_stats / apply_deltas themselves; recompute_job_stats rebuilds
+# the columns from the proposals table. JobPost.save() never writes them
+# back on updates.
+STAT_FIELDS = JobPost.STAT_FIELDS
+RECOMPUTE_BATCH_SIZE = 500
+
+
+def state_of(proposal):
+    return proposal.status, proposal.score_status, proposal.score
+
+
+def contribution(state):
+    """What a proposal in `state` (None = no proposal) adds to each STAT_FIELDS column."""
+    if state is None:
+        return 0, 0, 0, 0.0
+    status, score_status, score = state
+    scored = score_status == 'done'
+    return 1, int(status == 'shortlisted'), int(scored), score if scored else 0.0
+
+
+def adjust_job_stats(job_id, before=None, after=None):
+    """Re-count one proposal of `job_id` that went from state `before` to state `after`."""
+    deltas = [new - old for new, old in zip(contribution(after), contribution(before))]
+    apply_deltas(job_id, **dict(zip(STAT_FIELDS, deltas)))
+
+
+def apply_deltas(job_id, **deltas):
+    changes = {}
+    for field, delta in deltas.items():
+        if delta:
+            # Rows written around this bookkeeping (bulk_create, raw SQL) may have
+            # left a counter short; never let a decrement fail the delete/update
+            changes[field] = Greatest(F(field) + delta, 0) if field != 'score_total' else F(field) + delta
+    if changes:
+        # No cache version bump: cached job listings read these columns live
+        # through overlay_job_stats, so a HIT is never behind the counters
+        JobPost.objects.filter(pk=job_id).update(**changes)
+
+
+def overlay_job_stats(jobs):
+    """Replace the counters in serialized jobs (JobPostSerializer dicts) with the current ones, in one query."""
+    if not jobs:
+        return jobs
+    rows = JobPost.objects.only(*STAT_FIELDS).in_bulk([job['id'] for job in jobs])
+    for job in jobs:
+        row = rows.get(job['id'])
+        if row is not None:
+            job.update(proposal_count=row.proposal_count, shortlisted_count=row.shortlisted_count,
+                       avg_score=row.avg_score)
+    return jobs
+
+
+def set_score_state(proposal_id, score_status, score=None):
+    """Write a proposal's score_status (and score) with queryset.update(), keeping its job's aggregates in step."""
+    with transaction.atomic():
+        row = (
+            Proposal.objects.select_for_update().filter(pk=proposal_id)
+            .values_list('job_id', 'status', 'score_status', 'score').first()
+        )
+        if row is None:
+            return
+        job_id, status, old_score_status, old_score = row
+        fields = {'score_status': score_status}
+        if score is not None:
+            fields['score'] = score
+        Proposal.objects.filter(pk=proposal_id).update(**fields)
+        adjust_job_stats(
+            job_id,
+            before=(status, old_score_status, old_score),
+            after=(status, score_status, old_score if score is None else score),
+        )
+
+
+def recompute_job_stats(job_ids=None):
+    """Rebuild the aggregates of `job_ids` (every job if None); returns the row count."""
+    proposals = Proposal.objects.filter(job=OuterRef('pk')).order_by().values('job')
+
+    def aggregate(expression, default):
+        return Coalesce(Subquery(proposals.annotate(value=expression).values('value')), default)
+
+    if job_ids is None:
+        batches = [JobPost.objects.all()]
+    else:
+        # One UPDATE per batch: a single `pk IN (...)` over every job can exceed
+        # SQLite's bound-parameter limit (999 before 3.32)
+        job_ids = list(job_ids)
+        batches = [
+            JobPost.objects.filter(pk__in=job_ids[start:start + RECOMPUTE_BATCH_SIZE])
+            for start in range(0, len(job_ids), RECOMPUTE_BATCH_SIZE)
+        ]
+    updated = 0
+    for jobs in batches:
+        updated += jobs.update(
+            proposal_count=aggregate(Count('pk'), 0),
+            shortlisted_count=aggregate(Count('pk', filter=Q(status='shortlisted')), 0),
+            scored_count=aggregate(Count('pk', filter=Q(score_status='done')), 0),
+            score_total=aggregate(Sum('score', filter=Q(score_status='done')), Value(0.0)),
+        )
+    return updated
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from api.models import ResumeProfile
+
+
+class Command(BaseCommand):
+    help = "Extract and store resume text and scoring tokens for every ResumeProfile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Re-extract and re-tokenize even when the stored hashes match.",
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        updated = skipped = missing = failed = 0
+
+        for profile in ResumeProfile.objects.iterator():
+            changed = set()
+            try:
+                if profile.refresh_resume_text(force=force or not profile.resume_hash):
+                    changed |= {'resume_text', 'resume_hash'}
+            except FileNotFoundError:
+                missing += 1
+                self.stderr.write(f"Missing file for profile {profile.pk}: {profile.resume_file.name}")
+
+            try:
+                if profile.refresh_skill_tokens(force=force, raise_errors=True):
+                    changed |= {'skill_tokens', 'tokens_hash'}
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Tokenizing failed for profile {profile.pk}: {exc}")
+                # Keep the extracted text; the stale tokens_hash makes the next run retry.
+                # A queryset update, since save() would re-run the tokenizer
+                if changed:
+                    ResumeProfile.objects.filter(pk=profile.pk).update(
+                        **{field: getattr(profile, field) for field in changed}
+                    )
+                continue
+
+            if changed:
+                # Hashes are already current, so save() won't redo the work
+                profile.save(update_fields=changed)
+                updated += 1
+            else:
+                skipped += 1
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Updated {updated} resumes, {skipped} unchanged, {missing} missing files, "
+            f"{failed} failed to tokenize."
+        ))
@@ -0,0 +1,104 @@
+import io
+import json
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.matching_benchmark import EXTRACTORS, TOKENIZERS, compare_matching, profile_matching, run_matching_benchmark
+from api.nlp import get_nlp
+
+
+def page_counts(value):
+    try:
+        counts = [int(count) for count in value.split(',')]
+    except ValueError:
+        counts = []
+    if not counts or min(counts) < 1:
+        raise ValueError(value)
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Run generated resume PDFs through the matching engine (PDF extraction, noun-chunk "
+        "tokens, skill overlap) and report per-stage latency, documents per second and the "
+        "Python heap peak as JSON. Needs no database rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=50, help="Resumes per page count.")
+        parser.add_argument('--jobs', type=int, default=200, help="Jobs every resume is scored against.")
+        parser.add_argument('--pages', type=page_counts, default=[1, 4, 16],
+                            help="Comma-separated resume lengths in pages, one result bucket each.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed of the generated corpus.")
+        parser.add_argument('--warmup', type=int, default=2, help="Unmeasured resumes per bucket first.")
+        parser.add_argument('--tokenizer', choices=sorted(TOKENIZERS), default='spacy',
+                            help="'words' swaps spaCy for a plain word splitter, to isolate the other stages.")
+        parser.add_argument('--pdf', choices=sorted(EXTRACTORS), default='pool',
+                            help="'pool' is the sandboxed extractor used in production; 'inline' parses "
+                                 "in this process (and shows PyMuPDF in --profile output).")
+        parser.add_argument('--skip-memory', action='store_true', help="Skip the tracemalloc pass.")
+        parser.add_argument('--profile', metavar='PATH',
+                            help="Also run the corpus under cProfile and write the stats here.")
+        parser.add_argument('--profile-top', type=int, default=25,
+                            help="Functions by cumulative time to print with --profile.")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE',
+                            help="JSON report of an earlier run; exit non-zero on regressions.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed median stage latency growth against --compare (0.25 = 25%%).")
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help="Ignore median latency growth smaller than this many milliseconds.")
+
+    def handle(self, *args, **options):
+        if options['tokenizer'] == 'spacy':
+            try:
+                get_nlp()
+            except OSError as exc:
+                raise CommandError(f"Could not load the spaCy model ({exc}); install it or pass --tokenizer words.")
+
+        corpus = {
+            'seed': options['seed'],
+            'resumes': options['resumes'],
+            'jobs': options['jobs'],
+            'pages': options['pages'],
+            'tokenizer': options['tokenizer'],
+            'pdf': options['pdf'],
+        }
+
+        def progress(name, result):
+            stages = "  ".join(
+                f"{stage} p50 {summary['p50']:8.2f}ms" for stage, summary in result['stages'].items() if summary
+            )
+            peak = result.get('python_heap_peak_kb')
+            self.stderr.write(
+                f"{name:10} {result['docs_per_second']:8.1f} docs/s  {stages}"
+                + (f"  heap peak {peak:,.0f}KB" if peak is not None else "")
+            )
+
+        report = run_matching_benchmark(
+            warmup=options['warmup'], memory=not options['skip_memory'], progress=progress, **corpus,
+        )
+
+        if options['profile']:
+            profiler = profile_matching(options['profile'], **corpus)
+            self.stderr.write(f"cProfile stats written to {options['profile']}")
+            stats = io.StringIO()
+            pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(options['profile_top'])
+            self.stderr.write(stats.getvalue())
+
+        regressions = []
+        if options['compare']:
+            with open(options['compare']) as f:
+                regressions = compare_matching(report, json.load(f), options['threshold'], options['min_delta_ms'])
+            report['regressions'] = regressions
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
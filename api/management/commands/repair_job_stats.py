@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.job_stats import recompute_job_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute JobPost proposal counters and score aggregates from the proposals table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job', type=int, action='append', dest='jobs',
+            help="Only repair this job (repeatable). Defaults to every job.",
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_job_stats(options['jobs'])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed proposal stats for {updated} jobs."))
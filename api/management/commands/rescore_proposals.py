@@ -0,0 +1,138 @@
+import os
+import time
+from collections import deque
+from datetime import date
+from itertools import chain, islice
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from api.job_stats import recompute_job_stats
+from api.matching import content_hash, extract_tokens_batch, resume_source_text, score_tokens
+from api.models import JobPost, Proposal, ResumeProfile, ScoringJob
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Recompute Proposal.score in bulk, e.g. after required_skills or the scoring logic changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help="Only proposals for this job id.")
+        parser.add_argument('--employer', type=int, help="Only proposals for jobs of this employer id.")
+        parser.add_argument('--since', type=date.fromisoformat, help="Submitted on or after (YYYY-MM-DD).")
+        parser.add_argument('--until', type=date.fromisoformat, help="Submitted on or before (YYYY-MM-DD).")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help="Proposals loaded and written per batch.")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help="spaCy worker processes used to re-tokenize resumes.")
+        parser.add_argument('--retokenize', action='store_true',
+                            help="Rebuild every resume's tokens, not only stale ones (after an NLP change).")
+
+    def handle(self, *args, **options):
+        proposals = Proposal.objects.all()
+        if options['job']:
+            proposals = proposals.filter(job_id=options['job'])
+        if options['employer']:
+            proposals = proposals.filter(job__employer_id=options['employer'])
+        if options['since']:
+            proposals = proposals.filter(submitted_at__date__gte=options['since'])
+        if options['until']:
+            proposals = proposals.filter(submitted_at__date__lte=options['until'])
+        # Proposals with a queued or running ScoringJob are left to the worker: marking
+        # them 'done' here would report a score the queue is still about to write
+        queued = ScoringJob.objects.filter(proposal=OuterRef('pk'), status__in=['queued', 'running'])
+        proposals = proposals.alias(queued=Exists(queued))
+        skipped = proposals.filter(queued=True).count()
+        proposals = (
+            proposals.filter(queued=False)
+            .only('id', 'job_id', 'freelancer_id', 'score', 'score_status').order_by('pk')
+        )
+
+        chunk_size = options['chunk_size']
+        job_skills = {}  # job id -> skill names (JobPost.skill_tags)
+        total = 0
+        started = time.perf_counter()
+
+        # Every resume first, so stale ones share one nlp.pipe call (and its worker processes)
+        freelancer_ids = set(proposals.order_by().values_list('freelancer_id', flat=True).distinct())
+        token_sets, retokenized = self.load_tokens(freelancer_ids, options)
+        self.stdout.write(f"  {len(token_sets)} resumes loaded, {retokenized} re-tokenized")
+        if skipped:
+            self.stdout.write(f"  {skipped} proposals skipped (scoring job queued or running)")
+
+        for chunk in chunked(proposals.iterator(chunk_size=chunk_size), chunk_size):
+            self.load_job_skills({proposal.job_id for proposal in chunk} - job_skills.keys(), job_skills)
+            for proposal in chunk:
+                proposal.score = score_tokens(job_skills[proposal.job_id], token_sets[proposal.freelancer_id])
+                proposal.score_status = 'done'
+
+            Proposal.objects.bulk_update(chunk, ['score', 'score_status'])
+            total += len(chunk)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {total} proposals rescored ({total / elapsed:,.0f}/s)")
+
+        # bulk_update skips the per-proposal bookkeeping: rebuild the touched jobs' aggregates
+        recompute_job_stats(job_skills)
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {total} proposals in {elapsed:.2f}s ({rate:,.0f}/s); "
+            f"re-tokenized {retokenized} resumes."
+        ))
+
+    def load_job_skills(self, job_ids, job_skills):
+        """Fill job_skills for these jobs from the skill_tags join table."""
+        for ids in chunked(sorted(job_ids), 500):
+            job_skills.update((job_id, set()) for job_id in ids)
+            rows = JobPost.skill_tags.through.objects.filter(jobpost_id__in=ids).values_list('jobpost_id', 'skill__name')
+            for job_id, name in rows:
+                job_skills[job_id].add(name)
+
+    def load_tokens(self, freelancer_ids, options):
+        """
+        Token sets of these freelancers (empty without a resume) and the number of
+        resumes re-tokenized. Stale resumes stream through a single nlp.pipe call,
+        since each call with n_process > 1 starts workers that load the model again.
+        """
+        chunk_size = options['chunk_size']
+        token_sets = {freelancer_id: set() for freelancer_id in freelancer_ids}
+        queued = deque()  # (profile, digest) per text handed to nlp.pipe, in order
+
+        def stale_texts():
+            for user_ids in chunked(sorted(freelancer_ids), chunk_size):
+                for profile in ResumeProfile.objects.filter(user_id__in=user_ids):
+                    text = resume_source_text(profile)
+                    digest = content_hash(text.encode())
+                    token_sets[profile.user_id] = set(profile.skill_tokens)
+                    if options['retokenize'] or digest != profile.tokens_hash:
+                        queued.append((profile, digest))
+                        yield text
+
+        texts = stale_texts()
+        first = next(texts, None)
+        if first is None:
+            return token_sets, 0
+
+        retokenized, pending = 0, []
+        for tokens in extract_tokens_batch(chain([first], texts), n_process=options['processes']):
+            profile, digest = queued.popleft()
+            profile.skill_tokens = sorted(tokens)
+            profile.tokens_hash = digest
+            profile.updated_at = timezone.now()
+            token_sets[profile.user_id] = tokens
+            pending.append(profile)
+            if len(pending) == chunk_size:
+                retokenized += self.save_tokens(pending)
+                pending = []
+        return token_sets, retokenized + self.save_tokens(pending)
+
+    def save_tokens(self, profiles):
+        ResumeProfile.objects.bulk_update(profiles, ['skill_tokens', 'tokens_hash', 'updated_at'])
+        return len(profiles)
@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from api.benchmark import build_scenarios, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main API endpoints in-process against the current database and report "
+        "throughput, p50/p95/p99 latency and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help="Measured requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per scenario first.")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help="Only run this scenario (repeatable).")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+        parser.add_argument('--compare', metavar='BASELINE',
+                            help="JSON report of an earlier run; exit non-zero on regressions.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed median latency growth against --compare (0.25 = 25%%).")
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help="Ignore median latency growth smaller than this many milliseconds.")
+
+    def handle(self, *args, **options):
+        # 'testserver' host, locmem email: same environment the test client expects
+        setup_test_environment()
+        try:
+            scenarios = build_scenarios()
+        except LookupError as exc:
+            raise CommandError(str(exc))
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+
+        def progress(name, result):
+            latency = result['latency_ms']
+            self.stderr.write(
+                f"{name:24} {result['throughput_rps']:9.1f} req/s  p50 {latency['p50']:8.2f}ms  "
+                f"p95 {latency['p95']:8.2f}ms  p99 {latency['p99']:8.2f}ms  "
+                f"{result['queries']['max']:3} queries  status {result['status']}"
+            )
+
+        report = run_benchmarks(scenarios, options['iterations'], options['warmup'], progress)
+
+        regressions = []
+        if options['compare']:
+            with open(options['compare']) as f:
+                regressions = compare(report, json.load(f), options['threshold'], options['min_delta_ms'])
+            report['regressions'] = regressions
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
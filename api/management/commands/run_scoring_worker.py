@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from api.tasks import claim_jobs, reclaim_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued proposal scoring jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Number of jobs scored in parallel (threads).")
+        parser.add_argument('--max-attempts', type=int, default=3,
+                            help="Attempts per job before it is marked failed.")
+        parser.add_argument('--timeout', type=int, default=60,
+                            help="Seconds a job may run before it is considered stuck and retried.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the queue and exit instead of polling forever.")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        max_attempts = options['max_attempts']
+        timeout = options['timeout']
+        processed = succeeded = 0
+
+        self.stdout.write(f"Scoring worker started (concurrency={concurrency}).")
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            try:
+                while True:
+                    reclaim_stale_jobs(timeout, max_attempts)
+                    jobs = claim_jobs(concurrency)
+                    if not jobs:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    futures = [pool.submit(run_job, job, max_attempts) for job in jobs]
+                    done, not_done = wait(futures, timeout=timeout)
+                    processed += len(jobs)
+                    succeeded += sum(1 for f in done if f.exception() is None and f.result())
+                    if not_done:
+                        # Still holding their lease: reclaim_stale_jobs requeues them
+                        self.stderr.write(f"{len(not_done)} job(s) exceeded {timeout}s.")
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs, {succeeded} scored."))
@@ -0,0 +1,197 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.benchmark import SKILLS, WORDS
+from api.cache import bump_version
+from api.job_stats import recompute_job_stats
+from api.matching import content_hash, resume_source_text, score_tokens
+from api.models import ChatRoom, JobPost, Message, Proposal, ResumeProfile, Skill, User
+
+COUNTRIES = ['Nigeria', 'Kenya', 'Ghana', 'South Africa', 'Egypt', 'Rwanda', 'Uganda', 'Morocco']
+EMAIL_DOMAIN = 'bench.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, resumes, jobs, proposals, chat rooms and messages "
+        "using bulk_create. The same --seed and sizes give the same dataset, so benchmark runs on "
+        "different commits are comparable. Use a throwaway database (SQLITE_PATH=...)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employers', type=int, default=100)
+        parser.add_argument('--freelancers', type=int, default=1000)
+        parser.add_argument('--jobs', type=int, default=1000)
+        parser.add_argument('--proposals-per-job', type=int, default=20)
+        parser.add_argument('--rooms', type=int, default=500, help="Chat rooms (one per shortlisted proposal at most).")
+        parser.add_argument('--messages-per-room', type=int, default=40)
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; also namespaces the generated emails.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f"seed{options['seed']}"
+        if User.objects.filter(email__endswith=f"@{self.prefix}.{EMAIL_DOMAIN}").exists():
+            raise CommandError(
+                f"Data for --seed {options['seed']} already exists; seed a fresh database or pick another seed."
+            )
+
+        started = time.perf_counter()
+        self.now = timezone.now()
+        with transaction.atomic():
+            employers = self.create_users('employer', options['employers'])
+            freelancers = self.create_users('freelancer', options['freelancers'])
+            tokens = self.create_resumes(freelancers)
+            jobs, job_skills = self.create_jobs(employers, options['jobs'])
+            shortlisted = self.create_proposals(jobs, job_skills, freelancers, tokens, options['proposals_per_job'])
+            rooms = self.create_rooms(shortlisted, options['rooms'])
+            messages = self.create_messages(rooms, options['messages_per_room'])
+
+            # bulk_create skips the per-row bookkeeping: rebuild the derived data once
+            recompute_job_stats([job.pk for job in jobs])
+            bump_version('jobs')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(employers)} employers, {len(freelancers)} freelancers, {len(jobs)} jobs, "
+            f"{self.proposal_count} proposals, {len(rooms)} chat rooms and {messages} messages "
+            f"in {elapsed:.1f}s."
+        ))
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def spread_timestamps(self, model, objects, field, days=90):
+        """
+        auto_now_add stamps every bulk row with the same instant; spread them
+        over the last `days`, one plain UPDATE per day (bulk_update's CASE
+        expressions are far slower at this size).
+        """
+        by_day = {}
+        for obj in objects:
+            by_day.setdefault(self.rng.randrange(days), []).append(obj.pk)
+        for day, pks in sorted(by_day.items()):
+            value = self.now - timedelta(days=day, seconds=self.rng.randrange(86400))
+            for start in range(0, len(pks), self.batch_size):
+                model.objects.filter(pk__in=pks[start:start + self.batch_size]).update(**{field: value})
+
+    def sentence(self, words=12):
+        return " ".join(self.rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+    def link_skills(self, model, pairs):
+        """Create the `skill_tags` join rows for (object pk, skill names) pairs."""
+        skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+        through = model.skill_tags.through
+        column = f"{model._meta.model_name}_id"
+        self.bulk_create(through, [
+            through(**{column: pk, 'skill_id': skill_ids[name]}) for pk, names in pairs for name in names
+        ])
+
+    # -----------------------------
+    # Generators
+    # -----------------------------
+    def create_users(self, role, count):
+        password = make_password('benchmark')  # hashed once: hashing per user would dominate the run
+        return self.bulk_create(User, [
+            User(
+                email=f"{role}{i}@{self.prefix}.{EMAIL_DOMAIN}",
+                username=f"{self.prefix}-{role}{i}",
+                full_name=f"{role.title()} {i}",
+                role=role,
+                country=self.rng.choice(COUNTRIES),
+                bio=self.sentence(),
+                password=password,
+            )
+            for i in range(count)
+        ])
+
+    def create_resumes(self, freelancers):
+        """Resumes with their scoring tokens precomputed, so no NLP runs. Returns user id -> token set."""
+        Skill.objects.bulk_create([Skill(name=name) for name in SKILLS], ignore_conflicts=True)
+        profiles, tokens, pairs = [], {}, []
+        for user in freelancers:
+            skills = self.rng.sample(SKILLS, self.rng.randint(3, 8))
+            profile = ResumeProfile(
+                user=user,
+                skills=", ".join(skills),
+                experience=self.sentence(30),
+                education=self.sentence(8),
+            )
+            token_set = set(skills) | set(self.rng.sample(WORDS, 10))
+            profile.skill_tokens = sorted(token_set)
+            profile.tokens_hash = content_hash(resume_source_text(profile).encode())
+            profiles.append(profile)
+            tokens[user.pk] = token_set
+            pairs.append(skills)
+        profiles = self.bulk_create(ResumeProfile, profiles)
+        self.link_skills(ResumeProfile, [(profile.pk, skills) for profile, skills in zip(profiles, pairs)])
+        return tokens
+
+    def create_jobs(self, employers, count):
+        jobs, skill_lists = [], []
+        for i in range(count):
+            skills = self.rng.sample(SKILLS, self.rng.randint(2, 6))
+            jobs.append(JobPost(
+                employer=self.rng.choice(employers),
+                title=f"{skills[0].title()} developer for {self.rng.choice(WORDS)} {i}",
+                description=self.sentence(60),
+                required_skills=", ".join(skills),
+                budget=self.rng.randint(50, 5000),
+                status='Open' if self.rng.random() < 0.8 else 'Closed',
+            ))
+            skill_lists.append(skills)
+        jobs = self.bulk_create(JobPost, jobs)
+        self.spread_timestamps(JobPost, jobs, 'created_at')
+        self.link_skills(JobPost, [(job.pk, skills) for job, skills in zip(jobs, skill_lists)])
+        return jobs, {job.pk: set(skills) for job, skills in zip(jobs, skill_lists)}
+
+    def create_proposals(self, jobs, job_skills, freelancers, tokens, per_job):
+        """Returns the shortlisted proposals (chat rooms are opened for those)."""
+        proposals = []
+        per_job = min(per_job, len(freelancers))
+        for job in jobs:
+            for freelancer in self.rng.sample(freelancers, per_job):
+                roll = self.rng.random()
+                proposals.append(Proposal(
+                    job=job,
+                    freelancer=freelancer,
+                    cover_letter=self.sentence(40),
+                    score=score_tokens(job_skills[job.pk], tokens[freelancer.pk]),
+                    score_status='done',
+                    status='shortlisted' if roll < 0.1 else 'rejected' if roll < 0.2 else 'pending',
+                ))
+        proposals = self.bulk_create(Proposal, proposals)
+        self.spread_timestamps(Proposal, proposals, 'submitted_at')
+        self.proposal_count = len(proposals)
+        return [proposal for proposal in proposals if proposal.status == 'shortlisted']
+
+    def create_rooms(self, shortlisted, count):
+        picked = self.rng.sample(shortlisted, min(count, len(shortlisted)))
+        return self.bulk_create(ChatRoom, [
+            ChatRoom(job=proposal.job, employer=proposal.job.employer, freelancer=proposal.freelancer)
+            for proposal in picked
+        ])
+
+    def create_messages(self, rooms, per_room):
+        total = 0
+        batch = []
+        for room in rooms:
+            for i in range(per_room):
+                sender = room.employer if i % 2 else room.freelancer
+                batch.append(Message(room=room, sender=sender, content=self.sentence(self.rng.randint(3, 25))))
+            if len(batch) >= self.batch_size:
+                total += len(self.bulk_create(Message, batch))
+                batch = []
+        if batch:
+            total += len(self.bulk_create(Message, batch))
+        return total
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+
+from .metrics import timed
+from .nlp import get_nlp
+from .pdf import extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Resume text extraction
+# -----------------------------
+def read_file_bytes(field_file):
+    """Read a FieldFile/UploadedFile from the start and return its bytes."""
+    was_closed = field_file.closed
+    field_file.open('rb')
+    try:
+        return b"".join(field_file.chunks())
+    finally:
+        # Leave fresh uploads open: the storage still has to save them
+        if was_closed:
+            field_file.close()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def extract_text_from_pdf(data):
+    """Return the plain text of every page of a PDF given as bytes (see api/pdf.py for limits)."""
+    return engine.extract_text(data)
+
+
+# -----------------------------
+# Skill tokens & scoring
+# -----------------------------
+def resume_source_text(profile):
+    """Everything on a resume that feeds the scorer, as one lowercase string."""
+    return " ".join([
+        profile.skills or "",
+        profile.experience or "",
+        profile.education or "",
+        profile.resume_text or "",
+    ]).lower()
+
+
+def tokens_from_doc(doc):
+    return {chunk.text.strip().lower() for chunk in doc.noun_chunks}
+
+
+def extract_tokens(text):
+    """Normalized noun-chunk tokens of `text`."""
+    return engine.tokenize(text)
+
+
+def extract_tokens_batch(texts, n_process=1, batch_size=64):
+    """Yield token sets for many texts, batched (and optionally multi-process) via nlp.pipe."""
+    for doc in get_nlp().pipe(texts, n_process=n_process, batch_size=batch_size):
+        yield tokens_from_doc(doc)
+
+
+def parse_skills(skills):
+    """Split a comma-separated skill string into a normalized set."""
+    return {s.strip().lower() for s in (skills or "").split(',') if s.strip()}
+
+
+def score_tokens(job_skills, tokens):
+    """Percentage of the job's skills found in a resume's token set."""
+    if not job_skills:
+        return 0
+    matches = job_skills & tokens
+    return round((len(matches) / len(job_skills)) * 100, 2)
+
+
+def score_proposal(proposal):
+    """Score a proposal against its job using the freelancer's stored tokens."""
+    return engine.score_proposal(proposal)
+
+
+# -----------------------------
+# Matching engine
+# -----------------------------
+# Scoring is three stages: 'pdf' (resume text extraction), 'nlp' (noun-chunk
+# tokens) and 'score' (overlap with a job's skills). Each runs inside
+# `stage(name)`, which adds its time to the current request's span of the
+# same name and passes (stage, seconds) to every hook, e.g. the latency
+# recorder of `manage.py benchmark_matching`.
+def spacy_tokens(text):
+    return tokens_from_doc(get_nlp()(text))
+
+
+class MatchingEngine:
+    STAGES = ('pdf', 'nlp', 'score')
+
+    def __init__(self, hooks=(), extract=extract_pdf_text, tokenize=spacy_tokens):
+        self.hooks = list(hooks)
+        self.extract = extract
+        self.tokenizer = tokenize
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            with timed(name):
+                yield
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in self.hooks:
+                hook(name, elapsed)
+
+    def extract_text(self, data):
+        with self.stage('pdf'):
+            return self.extract(data)
+
+    def tokenize(self, text):
+        with self.stage('nlp'):
+            return self.tokenizer(text)
+
+    def score(self, job_skills, tokens):
+        with self.stage('score'):
+            return score_tokens(job_skills, tokens)
+
+    def match(self, data, job_skill_sets):
+        """Run a resume PDF through every stage; returns its score against each skill set, in order."""
+        tokens = self.tokenize(self.extract_text(data).lower())
+        with self.stage('score'):
+            return [score_tokens(job_skills, tokens) for job_skills in job_skill_sets]
+
+    def score_proposal(self, proposal):
+        profile = getattr(proposal.freelancer, 'resume', None)
+        if not profile:
+            return 0
+        # Normally a no-op: tokens are rebuilt when the resume is saved. If they are
+        # stale and can't be rebuilt, raise so the scoring queue retries the job
+        # instead of scoring against outdated tokens
+        if profile.refresh_skill_tokens(raise_errors=True):
+            profile.save(update_fields=['skill_tokens', 'tokens_hash'])
+        return self.score(proposal.job.skill_names(), set(profile.skill_tokens))
+
+
+engine = MatchingEngine()
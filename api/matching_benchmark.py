@@ -0,0 +1,233 @@
+import cProfile
+import gc
+import platform
+import random
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.utils import timezone
+
+from .benchmark import SKILLS, WORDS, current_commit, percentile
+from .matching import MatchingEngine, spacy_tokens
+from .pdf import _extract, extract_pdf_text
+
+
+# -----------------------------
+# Matching engine benchmark
+# -----------------------------
+# Generated resume PDFs go through MatchingEngine.match() against a fixed set
+# of jobs, outside any request or database. Stage latencies come from the
+# engine's hooks; the Python heap peak comes from a second, tracemalloc-only
+# pass, since tracing slows every allocation of the timed one. The corpus
+# depends only on the seed and sizes, so reports from two commits compare
+# directly (see compare_matching).
+def resume_page(rng, skills, words=350):
+    """One page of prose with the resume's skills mentioned in passing."""
+    sentences = []
+    while words > 0:
+        length = rng.randint(8, 18)
+        sentence = [rng.choice(WORDS) for _ in range(length)]
+        sentence.insert(rng.randrange(length), rng.choice(skills))
+        sentences.append(" ".join(sentence).capitalize() + ".")
+        words -= length + 1
+    return " ".join(sentences)
+
+
+def make_resume_pdf(rng, skills, pages):
+    import fitz  # PyMuPDF
+
+    with fitz.open() as doc:
+        for _ in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (50, 50, -50, -50), resume_page(rng, skills), fontsize=9)
+        return doc.tobytes()
+
+
+def build_corpus(seed, resumes, jobs, pages):
+    """Job skill sets, and `resumes` PDFs for each page count in `pages`."""
+    rng = random.Random(seed)
+    job_skill_sets = [set(rng.sample(SKILLS, rng.randint(2, 6))) for _ in range(jobs)]
+    documents = {
+        count: [make_resume_pdf(rng, rng.sample(SKILLS, rng.randint(3, 8)), count) for _ in range(resumes)]
+        for count in pages
+    }
+    return job_skill_sets, documents
+
+
+def word_tokens(text):
+    """Words and word pairs of `text`: a tokenizer with next to no cost, to measure the rest against."""
+    words = [word.rstrip('.,;:()') for word in text.split()]
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def inline_extract(data):
+    # PyMuPDF in this process: parsing cost without the pool's process hop
+    return _extract(data, settings.PDF_MAX_PAGES)
+
+
+TOKENIZERS = {'spacy': spacy_tokens, 'words': word_tokens}
+EXTRACTORS = {'pool': extract_pdf_text, 'inline': inline_extract}
+
+
+class StageRecorder:
+    """Engine hook keeping every stage duration, in milliseconds."""
+
+    def __init__(self):
+        self.durations = {stage: [] for stage in MatchingEngine.STAGES}
+
+    def __call__(self, stage, seconds):
+        self.durations[stage].append(seconds * 1000)
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    if not durations:
+        return None
+    total = sum(durations)
+    return {
+        'mean': round(total / len(durations), 3),
+        'p50': round(percentile(durations, 50), 3),
+        'p95': round(percentile(durations, 95), 3),
+        'max': round(durations[-1], 3),
+        'total': round(total, 3),
+    }
+
+
+def run_bucket(engine, documents, job_skill_sets, warmup, memory=True):
+    # The first documents load the spaCy model and start the PDF pool
+    for data in documents[:warmup]:
+        engine.match(data, job_skill_sets)
+
+    recorder = StageRecorder()
+    engine.hooks.append(recorder)
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for data in documents:
+            engine.match(data, job_skill_sets)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+        engine.hooks.remove(recorder)
+
+    stages = {stage: summarize(durations) for stage, durations in recorder.durations.items()}
+    result = {
+        'documents': len(documents),
+        'pdf_kb_mean': round(sum(map(len, documents)) / len(documents) / 1024, 1),
+        'docs_per_second': round(len(documents) / elapsed, 2) if elapsed else 0.0,
+        'stages': stages,
+        'stage_share': {
+            stage: round(summary['total'] / (elapsed * 1000), 3) if elapsed else 0.0
+            for stage, summary in stages.items()
+        },
+    }
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for data in documents:
+                engine.match(data, job_skill_sets)
+            result['python_heap_peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def max_rss_kb():
+    """Peak resident set size of this process and of its reaped children (the PDF pool), Unix only."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def library_versions(tokenizer):
+    import fitz
+
+    versions = {'pymupdf': fitz.VersionBind}
+    if tokenizer == 'spacy':
+        import spacy
+
+        versions['spacy'] = spacy.__version__
+        versions['model'] = settings.NLP_MODEL_NAME
+    return versions
+
+
+def run_matching_benchmark(seed=42, resumes=50, jobs=200, pages=(1, 4, 16), tokenizer='spacy', pdf='pool',
+                           warmup=2, memory=True, progress=None):
+    job_skill_sets, documents = build_corpus(seed, resumes, jobs, pages)
+    engine = MatchingEngine(extract=EXTRACTORS[pdf], tokenize=TOKENIZERS[tokenizer])
+
+    buckets = {}
+    for count, bucket in documents.items():
+        name = f"pages_{count}"
+        buckets[name] = run_bucket(engine, bucket, job_skill_sets, warmup, memory)
+        if progress is not None:
+            progress(name, buckets[name])
+
+    return {
+        'meta': {
+            'commit': current_commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'libraries': library_versions(tokenizer),
+            'tokenizer': tokenizer,
+            'pdf': pdf,
+            'warmup': warmup,
+            'corpus': {'seed': seed, 'resumes': resumes, 'jobs': jobs, 'pages': list(pages)},
+        },
+        'buckets': buckets,
+        'max_rss_kb': max_rss_kb(),
+    }
+
+
+def profile_matching(path, seed=42, resumes=50, jobs=200, pages=(1, 4, 16), tokenizer='spacy', pdf='pool'):
+    """Run the corpus once under cProfile and dump the stats to `path` (for pstats/snakeviz)."""
+    job_skill_sets, documents = build_corpus(seed, resumes, jobs, pages)
+    engine = MatchingEngine(extract=EXTRACTORS[pdf], tokenize=TOKENIZERS[tokenizer])
+    engine.match(documents[pages[0]][0], job_skill_sets)  # model load and pool start-up stay out of the profile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for bucket in documents.values():
+        for data in bucket:
+            engine.match(data, job_skill_sets)
+    profiler.disable()
+    profiler.dump_stats(path)
+    return profiler
+
+
+def compare_matching(report, baseline, threshold, min_delta_ms=1.0):
+    """
+    Regressions of `report` against `baseline`: a stage whose median latency
+    grew by more than `threshold` (0.25 = 25%) and at least `min_delta_ms`,
+    or a Python heap peak that grew by more than `threshold`.
+    """
+    regressions = []
+    for name, result in report['buckets'].items():
+        before = baseline.get('buckets', {}).get(name)
+        if before is None:
+            continue
+        for stage, summary in result['stages'].items():
+            old = (before['stages'].get(stage) or {}).get('p50')
+            if not old or not summary:
+                continue
+            new = summary['p50']
+            if new > old * (1 + threshold) and new - old >= min_delta_ms:
+                regressions.append(f"{name} {stage}: p50 {new:.2f}ms (was {old:.2f}ms, +{new / old - 1:.0%})")
+        old_peak, new_peak = before.get('python_heap_peak_kb'), result.get('python_heap_peak_kb')
+        if old_peak and new_peak and new_peak > old_peak * (1 + threshold):
+            regressions.append(f"{name}: heap peak {new_peak:,.0f}KB (was {old_peak:,.0f}KB)")
+
+    meta, old_meta = report['meta'], baseline.get('meta', {})
+    for key in ('corpus', 'tokenizer', 'pdf'):
+        if meta[key] != old_meta.get(key):
+            regressions.append(f"{key} differs from the baseline's; results are not comparable")
+    return regressions
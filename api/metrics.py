@@ -0,0 +1,168 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+
+# -----------------------------
+# Request metrics (Prometheus text format)
+# -----------------------------
+# Metrics live in process memory: under gunicorn each worker reports its own
+# numbers, so scrape every worker (or sum across them) for totals.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            label_str = format_labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_str},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_str}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{label_str}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels, value=1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{format_labels(labels)}}} {value}")
+        return lines
+
+
+def format_labels(labels):
+    return ",".join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in labels
+    )
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Requests by route, method and status.')
+        self.latency = Histogram('http_request_duration_seconds', 'Request latency.', LATENCY_BUCKETS)
+        self.db_time = Histogram('http_request_db_duration_seconds', 'SQL time per request.', LATENCY_BUCKETS)
+        self.db_queries = Histogram('http_request_db_queries', 'SQL queries per request.', QUERY_BUCKETS)
+        self.render_time = Histogram('http_request_render_duration_seconds',
+                                     'Response rendering (serialization) time per request.', LATENCY_BUCKETS)
+        self.size = Histogram('http_response_size_bytes', 'Response body size (streaming responses excluded).',
+                              SIZE_BUCKETS)
+        self.spans = Histogram('http_request_span_duration_seconds',
+                               'Time in named code sections (nlp, pdf, ...) per request.', LATENCY_BUCKETS)
+
+    def record(self, route, method, status, timing):
+        labels = (('route', route), ('method', method))
+        with self.lock:
+            self.requests.inc(labels + (('status', status),))
+            self.latency.observe(labels, timing.total)
+            self.db_time.observe(labels, timing.db_time)
+            self.db_queries.observe(labels, timing.db_queries)
+            self.render_time.observe(labels, timing.render_time)
+            if timing.size is not None:
+                self.size.observe(labels, timing.size)
+            for name, duration in timing.spans.items():
+                self.spans.observe(labels + (('span', name),), duration)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.db_time, self.db_queries,
+                           self.render_time, self.size, self.spans):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# -----------------------------
+# Per-request timing
+# -----------------------------
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_done = None
+        self.total = 0.0
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.render_time = 0.0
+        self.size = None  # unknown for streaming responses: their body is sent after we return
+        self.spans = {}
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def server_timing(self):
+        entries = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'render;dur={self.render_time * 1000:.1f}',
+        ]
+        entries += [f'{name};dur={duration * 1000:.1f}' for name, duration in self.spans.items()]
+        entries.append(f'total;dur={self.total * 1000:.1f}')
+        return ", ".join(entries)
+
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+@contextmanager
+def timed(name):
+    """Attribute the enclosed time to span `name` of the current request (no-op outside one)."""
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.spans[name] = timing.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, protected by `Authorization: Bearer <METRICS_TOKEN>`."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    header = request.headers.get('Authorization', '')
+    if not constant_time_compare(header, f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,80 @@
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from .metrics import RequestTiming, current_timing, registry
+
+
+# -----------------------------
+# WebSocket authentication with SimpleJWT access tokens
+# -----------------------------
+@database_sync_to_async
+def get_jwt_user(raw_token):
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Sets scope["user"] from the same access token the REST API uses.
+    Browsers can't send headers on a WebSocket handshake, so the token is
+    read from `?token=<access token>`.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        scope['user'] = await get_jwt_user(token[0]) if token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
+
+
+# -----------------------------
+# Request profiling (Server-Timing header + /metrics)
+# -----------------------------
+class ProfilingMiddleware:
+    """
+    Times every request: total latency, SQL query count and time, response
+    rendering and any `timed()` spans. Adds a Server-Timing header and feeds
+    the per-route histograms served at /metrics. Keep it first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            with connection.execute_wrapper(timing.sql_wrapper):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+
+        now = time.perf_counter()
+        timing.total = now - timing.started
+        if timing.view_done is not None:
+            timing.render_time = now - timing.view_done
+        if not response.streaming:
+            timing.size = len(response.content)
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        registry.record(route, request.method, response.status_code, timing)
+        response['Server-Timing'] = timing.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns: everything from here on is serialization
+        timing = current_timing.get()
+        if timing is not None:
+            timing.view_done = time.perf_counter()
+        return response
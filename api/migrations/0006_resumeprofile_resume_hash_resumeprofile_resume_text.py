@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alter_message_options_remove_message_thread_chatroom_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='resume_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='SHA-256 of resume_file at extraction time', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='resume_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
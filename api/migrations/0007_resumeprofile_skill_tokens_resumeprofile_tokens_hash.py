@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_resumeprofile_resume_hash_resumeprofile_resume_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='skill_tokens',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Sorted normalized noun-chunk tokens'),
+        ),
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='tokens_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='SHA-256 of the text skill_tokens was built from', max_length=64),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_proposal_score_status_scoringjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Lowercase, trimmed skill name', max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='jobs', to='api.skill'),
+        ),
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='resumes', to='api.skill'),
+        ),
+    ]
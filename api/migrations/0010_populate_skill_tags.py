@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+def parse_skills(skills):
+    return {s.strip().lower()[:255] for s in (skills or "").split(',') if s.strip()}
+
+
+def populate_skill_tags(apps, schema_editor):
+    Skill = apps.get_model('api', 'Skill')
+    JobPost = apps.get_model('api', 'JobPost')
+    ResumeProfile = apps.get_model('api', 'ResumeProfile')
+
+    jobs = {job.pk: parse_skills(job.required_skills) for job in JobPost.objects.only('pk', 'required_skills')}
+    resumes = {r.pk: parse_skills(r.skills) for r in ResumeProfile.objects.only('pk', 'skills')}
+
+    names = set().union(*jobs.values(), *resumes.values())
+    Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+
+    JobPost.skill_tags.through.objects.bulk_create([
+        JobPost.skill_tags.through(jobpost_id=pk, skill_id=skill_ids[name])
+        for pk, skills in jobs.items() for name in skills
+    ], ignore_conflicts=True)
+    ResumeProfile.skill_tags.through.objects.bulk_create([
+        ResumeProfile.skill_tags.through(resumeprofile_id=pk, skill_id=skill_ids[name])
+        for pk, skills in resumes.items() for name in skills
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_skill_jobpost_skill_tags_resumeprofile_skill_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_skill_tags, migrations.RunPython.noop),
+    ]
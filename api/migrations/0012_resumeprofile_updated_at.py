@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_jobpost_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_proposal_stats(apps, schema_editor):
+    JobPost = apps.get_model('api', 'JobPost')
+    Proposal = apps.get_model('api', 'Proposal')
+    proposals = Proposal.objects.filter(job=OuterRef('pk')).order_by().values('job')
+
+    def aggregate(expression, default):
+        return Coalesce(Subquery(proposals.annotate(value=expression).values('value')), default)
+
+    JobPost.objects.update(
+        proposal_count=aggregate(Count('pk'), 0),
+        shortlisted_count=aggregate(Count('pk', filter=Q(status='shortlisted')), 0),
+        scored_count=aggregate(Count('pk', filter=Q(score_status='done')), 0),
+        score_total=aggregate(Sum('score', filter=Q(score_status='done')), Value(0.0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='proposal_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='score_total',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='scored_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='shortlisted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_proposal_stats, migrations.RunPython.noop),
+    ]
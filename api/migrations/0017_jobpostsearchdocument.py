@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_chatreadmarker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostSearchDocument',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='api.jobpost')),
+                ('document', models.TextField(db_column='api_jobpost_fts')),
+            ],
+            options={
+                'db_table': 'api_jobpost_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:09
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_jobpostsearchdocument'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='CacheVersion',
+        ),
+    ]
@@ -1,8 +1,13 @@
+import logging
+
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 from django.contrib.auth.models import AbstractUser
 
+logger = logging.getLogger(__name__)
+
 # -----------------------------
 # 1. Custom User Model
 # -----------------------------
@@ -33,23 +38,171 @@ class User(AbstractUser):
 
         super(User, self).save(*args, **kwargs)
 
+# -----------------------------
+# 1b. Skill (normalized tag shared by jobs and resumes)
+# -----------------------------
+class Skill(models.Model):
+    name = models.CharField(max_length=255, unique=True, help_text="Lowercase, trimmed skill name")
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def resolve(cls, names):
+        """Return Skill rows for these normalized names, creating any that are missing."""
+        names = {name[:255] for name in names}
+        if not names:
+            return []
+        existing = {skill.name: skill for skill in cls.objects.filter(name__in=names)}
+        missing = names - existing.keys()
+        if missing:
+            cls.objects.bulk_create([cls(name=name) for name in missing], ignore_conflicts=True)
+            existing.update((skill.name, skill) for skill in cls.objects.filter(name__in=missing))
+        return list(existing.values())
+
+
+class SkillTaggedMixin:
+    """
+    Keeps the `skill_tags` many-to-many in sync with a comma-separated text
+    field. The text stays the API-facing form; the join table is what gets
+    queried ("jobs needing X", "freelancers with X").
+    """
+    skill_source_field = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._synced_skills = instance.__dict__.get(cls.skill_source_field)
+        return instance
+
+    def sync_skill_tags(self, force=False):
+        from .matching import parse_skills
+
+        text = getattr(self, self.skill_source_field)
+        if text == getattr(self, '_synced_skills', None) and not force:
+            return
+        self.skill_tags.set(Skill.resolve(parse_skills(text)))
+        self._synced_skills = text
+
+    def skill_names(self):
+        """The normalized skill names; no query when `skill_tags` was prefetched."""
+        return {skill.name for skill in self.skill_tags.all()}
+
+
 # -----------------------------
 # 2. Resume Profile (Freelancer only)
 # -----------------------------
-class ResumeProfile(models.Model):
+class ResumeProfile(SkillTaggedMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='resume')
     skills = models.TextField(help_text="Comma-separated skill tags")
+    skill_tags = models.ManyToManyField(Skill, blank=True, related_name='resumes')
     experience = models.TextField(blank=True)
     education = models.TextField(blank=True)
     resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
+    # Text extracted from resume_file, cached so scoring never parses the PDF
+    resume_text = models.TextField(blank=True, default='', editable=False)
+    resume_hash = models.CharField(max_length=64, blank=True, default='', editable=False,
+                                   help_text="SHA-256 of resume_file at extraction time")
+    # Precomputed scoring tokens, so applying to a job is a plain set intersection
+    skill_tokens = models.JSONField(default=list, blank=True, editable=False,
+                                    help_text="Sorted normalized noun-chunk tokens")
+    tokens_hash = models.CharField(max_length=64, blank=True, default='', editable=False,
+                                   help_text="SHA-256 of the text skill_tokens was built from")
+
+    # Lets each process's candidate matrix pick up edits (see candidate_index.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    TOKEN_SOURCE_FIELDS = {'skills', 'experience', 'education', 'resume_text'}
+    skill_source_field = 'skills'
 
     def __str__(self):
         return f"{self.user.username}'s Resume"
 
+    def refresh_resume_text(self, force=False):
+        """
+        Re-extract resume_text when resume_file was uploaded or changed.
+        Returns True if the stored text/hash changed.
+        """
+        from .matching import read_file_bytes, content_hash, extract_text_from_pdf
+        from .pdf import PDFExtractionError
+
+        if not self.resume_file:
+            changed = bool(self.resume_text or self.resume_hash)
+            self.resume_text, self.resume_hash = '', ''
+            return changed
+
+        # A committed file with a stored hash hasn't been replaced since last extraction
+        if self.resume_file._committed and self.resume_hash and not force:
+            return False
+
+        data = read_file_bytes(self.resume_file)
+        digest = content_hash(data)
+        if digest == self.resume_hash and not force:
+            return False
+
+        try:
+            self.resume_text = extract_text_from_pdf(data)
+        except PDFExtractionError as exc:
+            logger.warning("Resume extraction failed for profile %s: %s", self.pk, exc)
+            self.resume_text = ''
+            # A broken or oversized PDF stays broken: record its hash so it isn't retried.
+            # Busy/timeout leave the hash unset, so the next save or backfill tries again
+            self.resume_hash = '' if exc.code in PDFExtractionError.TRANSIENT else digest
+            return True
+        except Exception:
+            logger.exception("Resume extraction failed for profile %s", self.pk)
+            self.resume_text, self.resume_hash = '', ''
+            return True
+        self.resume_hash = digest
+        return True
+
+    def refresh_skill_tokens(self, force=False, raise_errors=False):
+        """
+        Rebuild skill_tokens when any scored field changed since the last build.
+        Returns True if the stored tokens/hash changed. With raise_errors, a
+        tokenizer failure propagates instead of leaving the stale tokens in place.
+        """
+        from .matching import resume_source_text, content_hash, extract_tokens
+
+        text = resume_source_text(self)
+        digest = content_hash(text.encode())
+        if digest == self.tokens_hash and not force:
+            return False
+
+        try:
+            self.skill_tokens = sorted(extract_tokens(text))
+        except Exception:
+            if raise_errors:
+                raise
+            # Leave the hash stale so the next save retries
+            logger.exception("Skill tokenization failed for profile %s", self.pk)
+            return False
+        self.tokens_hash = digest
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        changed = set()
+
+        if update_fields is None or 'resume_file' in update_fields:
+            if self.refresh_resume_text():
+                changed |= {'resume_text', 'resume_hash'}
+
+        if update_fields is None or self.TOKEN_SOURCE_FIELDS & (set(update_fields) | changed):
+            if self.refresh_skill_tokens():
+                changed |= {'skill_tokens', 'tokens_hash'}
+
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | changed | {'updated_at'}
+        super().save(*args, **kwargs)
+
+        if update_fields is None or 'skills' in update_fields:
+            self.sync_skill_tags()
+
 # -----------------------------
 # 3. Job Post (Employer)
 # -----------------------------
-class JobPost(models.Model):
+class JobPost(SkillTaggedMixin, models.Model):
     STATUS = (
         ("Open", "Open"),
         ("Closed", "Closed"),
@@ -59,15 +212,76 @@ class JobPost(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     required_skills = models.TextField(help_text="Comma-separated skill tags")
+    skill_tags = models.ManyToManyField(Skill, blank=True, related_name='jobs')
     budget = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS, default='Open')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Lets each process's in-memory job index pick up changes (see job_index.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Proposal aggregates, maintained by api/job_stats.py
+    # (`manage.py repair_job_stats` recomputes them)
+    proposal_count = models.PositiveIntegerField(default=0)
+    shortlisted_count = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0.0)
+
+    STAT_FIELDS = ('proposal_count', 'shortlisted_count', 'scored_count', 'score_total')
+
+    skill_source_field = 'required_skills'
 
     def __str__(self):
         return f"{self.title} by {self.employer.username}"
+
+    @property
+    def avg_score(self):
+        """Mean score of the job's scored proposals, or None before any is scored."""
+        if not self.scored_count:
+            return None
+        return round(self.score_total / self.scored_count, 2)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'updated_at'}
+        elif not self._state.adding and not kwargs.get('force_insert'):
+            # ✅ Never write back the aggregates loaded with the row: that would undo
+            # every F() increment made since (see api/job_stats.py)
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STAT_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        if update_fields is None or 'required_skills' in update_fields:
+            self.sync_skill_tags()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Open-job listing and its keyset pages (JobPostView)
+            models.Index(fields=['status', '-created_at', '-id'], name='jobpost_status_created_idx'),
+            # Per-employer listing (EmployerJobListView)
+            models.Index(fields=['employer', '-created_at'], name='jobpost_employer_created_idx'),
+        ]
+
+
+# -----------------------------
+# 3b. Job search index (SQLite FTS5, see api/search.py)
+# -----------------------------
+class JobPostSearchDocument(models.Model):
+    """
+    Read-only mapping of the api_jobpost_fts virtual table, so job searches
+    can join it through the ORM. The table and the triggers that keep it in
+    sync are created by SqliteFTSBackend.install(), not by migrations.
+    """
+    job = models.OneToOneField(JobPost, primary_key=True, db_column='rowid', db_constraint=False,
+                               on_delete=models.DO_NOTHING, related_name='search_document')
+    # FTS5's hidden column named after the table: the left side of MATCH
+    document = models.TextField(db_column='api_jobpost_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'api_jobpost_fts'
 
 
 # -----------------------------
@@ -80,16 +294,84 @@ class Proposal(models.Model):
         ('rejected', 'Rejected'),
     )
 
+    SCORE_STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    # Job status that follows from moving one of its proposals to this status
+    JOB_STATUS_FOR = {
+        'shortlisted': 'Closed',
+        'rejected': 'Open',
+    }
+
     freelancer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='proposals')
     job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='proposals')
     cover_letter = models.TextField()
     submitted_at = models.DateTimeField(auto_now_add=True)
     score = models.FloatField(default=0.0)
+    score_status = models.CharField(max_length=20, choices=SCORE_STATUS_CHOICES, default='pending')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
 
+    # Written only by job_stats.set_score_state, under a row lock
+    SCORE_FIELDS = ('score', 'score_status')
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            # ✅ Don't write back a score loaded before the scoring worker finished
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SCORE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the job's aggregates currently count for this row (see job_stats.py)
+        instance._counted_state = (
+            instance.__dict__.get('status'),
+            instance.__dict__.get('score_status'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
     class Meta:
         unique_together = ('job', 'freelancer')
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['freelancer', '-submitted_at'], name='proposal_freelancer_sub_idx'),
+            models.Index(fields=['job', '-submitted_at'], name='proposal_job_submitted_idx'),
+            models.Index(fields=['job', 'status'], name='proposal_job_status_idx'),
+        ]
+
+
+# -----------------------------
+# 4b. Scoring queue (processed by `manage.py run_scoring_worker`)
+# -----------------------------
+class ScoringJob(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    proposal = models.ForeignKey(Proposal, on_delete=models.CASCADE, related_name='scoring_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"Scoring job for proposal {self.proposal_id} ({self.status})"
 
 
 # -----------------------------
@@ -138,5 +420,22 @@ class Message(models.Model):
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['room', 'timestamp', 'id'], name='message_room_timestamp_idx')]
+
     def __str__(self):
         return f"Message from {self.sender.username} at {self.timestamp}"
+
+
+class ChatReadMarker(models.Model):
+    """How far one participant has read a ChatRoom: every message up to last_read_message_id."""
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='read_markers')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_read_markers')
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('room', 'user')
+
+    def __str__(self):
+        return f"{self.user} read room {self.room_id} up to message {self.last_read_message_id}"
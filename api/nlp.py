@@ -0,0 +1,39 @@
+import threading
+
+from django.conf import settings
+
+
+# -----------------------------
+# Process-wide spaCy model registry
+# -----------------------------
+# The scorer only reads `doc.noun_chunks`, which needs the tagger and the
+# dependency parser. NER and the lemmatizer are never used, so we exclude
+# them at load time: they are not even read from disk.
+#
+# spaCy itself (with thinc and numpy) is imported on first use too, so
+# `manage.py migrate`, `collectstatic` and URL loading never pay for it.
+EXCLUDED_COMPONENTS = ["ner", "lemmatizer"]
+
+_nlp = None
+_lock = threading.Lock()
+
+
+def get_nlp():
+    """Return the shared spaCy pipeline, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                import spacy
+
+                _nlp = spacy.load(settings.NLP_MODEL_NAME, exclude=EXCLUDED_COMPONENTS)
+    return _nlp
+
+
+def preload_nlp():
+    """
+    Load the model eagerly. Called from ApiConfig.ready() when NLP_PRELOAD is on,
+    so under `gunicorn --preload` the model lives in the master process and
+    workers share its pages copy-on-write after fork.
+    """
+    return get_nlp()
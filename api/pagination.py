@@ -0,0 +1,149 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique (field, id) key, in both directions.
+
+    Each page is a `WHERE (field, id) > (last field, last id)` range scan, so
+    deep pages cost the same as the first one and no COUNT(*) is run.
+
+    `ordering` is the natural order of results, e.g. ('-created_at', '-id').
+    Without a cursor the first page starts at the beginning of that order,
+    or at its end when `start_from_end` is set (e.g. "latest N messages").
+
+    Keyset mode is opt-in: it is used when the request carries the cursor
+    parameter (an empty value means "first page"). Otherwise the request is
+    handed to `fallback_class`, or left unpaginated if there is none, so
+    existing clients keep working.
+    """
+
+    ordering = ('-id',)
+    page_size = 20
+    max_page_size = 100
+    start_from_end = False
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    fallback_class = None
+
+    def use_keyset(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        if not self.use_keyset(request):
+            if self.fallback_class is None:
+                return None
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.base_url = request.build_absolute_uri()
+        self.field_name = self.ordering[0].lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        page_size = self.get_page_size(request)
+        position, forward = self.decode_cursor(request)
+
+        if position is None and self.start_from_end:
+            forward = False
+
+        ordering = self.ordering if forward else self.reverse_ordering()
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, forward))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        # Whatever lies on the far side of the cursor is another page; on the
+        # near side, only the extra row fetched tells us.
+        if forward:
+            has_previous, has_next = position is not None, has_more
+        else:
+            has_previous, has_next = has_more, position is not None
+
+        self.next_cursor = self.encode_cursor(rows[-1], True) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], False) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_link(self.next_cursor)),
+            ('previous', self.get_link(self.previous_cursor)),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def reverse_ordering(self):
+        return tuple(o[1:] if o.startswith('-') else f'-{o}' for o in self.ordering)
+
+    def seek_filter(self, position, forward):
+        value, pk = position
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        return (
+            Q(**{f'{self.field_name}__{lookup}': value})
+            | Q(**{self.field_name: value, f'pk__{lookup}': pk})
+        )
+
+    def encode_cursor(self, row, forward):
+        payload = {
+            'v': self.field.value_to_string(row),
+            'id': row.pk,
+            'd': 'n' if forward else 'p',
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, True
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = (self.field.to_python(payload['v']), int(payload['id']))
+            return position, payload['d'] == 'n'
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound("Invalid cursor")
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Keyset cursor; pass an empty value for the first page.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
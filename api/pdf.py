@@ -0,0 +1,158 @@
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Sandboxed PDF text extraction
+# -----------------------------
+# PyMuPDF runs in a small pool of separate processes, never in the request
+# worker: a huge or hostile upload can only burn a pool process, which is
+# killed when it runs past PDF_TIMEOUT or its memory cap. Only PDF_WORKERS
+# documents are extracted at once per web process; callers that can't get
+# a slot within PDF_TIMEOUT get a "busy" error instead of piling up.
+class PDFExtractionError(Exception):
+    """Extraction failed; `code` is one of the constants below, `message` is safe to show users."""
+    TOO_LARGE = 'too_large'
+    TOO_MANY_PAGES = 'too_many_pages'
+    TIMEOUT = 'timeout'
+    INVALID = 'invalid_pdf'
+    BUSY = 'busy'
+    # Says nothing about the document: worth trying again later
+    TRANSIENT = (TIMEOUT, BUSY)
+
+    def __init__(self, code, message):
+        super().__init__(code, message)
+        self.code = code
+        self.message = message
+
+    def __str__(self):
+        return f"{self.code}: {self.message}"
+
+
+def _limit_memory(max_bytes):
+    """Pool initializer: cap the worker's address space (Unix only)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    if max_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+def _extract(data, max_pages):
+    """Runs in a pool process. Returns the text of every page, assembled in one buffer."""
+    import fitz  # PyMuPDF
+
+    try:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            if doc.page_count > max_pages:
+                raise PDFExtractionError(
+                    PDFExtractionError.TOO_MANY_PAGES,
+                    f"PDF has {doc.page_count} pages; the limit is {max_pages}.",
+                )
+            buffer = io.StringIO()
+            for page in doc:
+                buffer.write(page.get_text())
+            return buffer.getvalue()
+    except PDFExtractionError:
+        raise
+    except MemoryError:
+        raise PDFExtractionError(PDFExtractionError.TOO_LARGE, "PDF needs too much memory to read.")
+    except Exception as exc:
+        raise PDFExtractionError(PDFExtractionError.INVALID, f"Could not read PDF: {exc}")
+
+
+class PDFExtractor:
+    def __init__(self, workers, timeout, max_pages, max_bytes, memory_limit):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.memory_limit = memory_limit
+        self.slots = threading.BoundedSemaphore(workers)
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def get_pool(self):
+        # Created on first use, so gunicorn's master (preload_app) never owns one
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn: forking a threaded web worker can copy held locks
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_limit_memory,
+                    initargs=(self.memory_limit,),
+                    # Recycle workers so PyMuPDF's heap can't grow forever
+                    max_tasks_per_child=100,
+                )
+            return self.pool
+
+    def discard_pool(self, pool):
+        """Kill every process of `pool` (e.g. one stuck on a document) and start afresh next time."""
+        with self.lock:
+            if self.pool is pool:
+                self.pool = None
+        for process in list((getattr(pool, '_processes', None) or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, data):
+        if len(data) > self.max_bytes:
+            raise PDFExtractionError(
+                PDFExtractionError.TOO_LARGE,
+                f"PDF is {len(data)} bytes; the limit is {self.max_bytes}.",
+            )
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PDFExtractionError(PDFExtractionError.BUSY, "PDF extraction is busy; try again shortly.")
+        try:
+            # A pool killed because of someone else's document fails every task it held: retry once
+            for attempt in range(2):
+                pool = self.get_pool()
+                future = pool.submit(_extract, data, self.max_pages)
+                try:
+                    return future.result(timeout=self.timeout)
+                except TimeoutError:
+                    logger.warning("PDF extraction timed out after %ss; restarting the pool", self.timeout)
+                    self.discard_pool(pool)
+                    raise PDFExtractionError(
+                        PDFExtractionError.TIMEOUT, f"PDF took longer than {self.timeout}s to read.",
+                    )
+                except BrokenProcessPool:
+                    self.discard_pool(pool)
+                    if attempt:
+                        # Died twice (e.g. hit the memory cap): blame the document
+                        raise PDFExtractionError(PDFExtractionError.TOO_LARGE, "PDF needs too much memory to read.")
+        finally:
+            self.slots.release()
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PDFExtractor(
+                workers=settings.PDF_WORKERS,
+                timeout=settings.PDF_TIMEOUT,
+                max_pages=settings.PDF_MAX_PAGES,
+                max_bytes=settings.PDF_MAX_BYTES,
+                memory_limit=settings.PDF_WORKER_MEMORY,
+            )
+        return _extractor
+
+
+def extract_pdf_text(data):
+    """Plain text of a PDF given as bytes; raises PDFExtractionError."""
+    return get_extractor().extract(data)
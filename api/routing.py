@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import ChatConsumer
+
+websocket_urlpatterns = [
+    # 💬 Real-time chat (ws://.../ws/chat/<room_id>/?token=<access token>)
+    path('ws/chat/<int:room_id>/', ChatConsumer.as_asgi()),
+]
@@ -0,0 +1,176 @@
+import logging
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import BooleanField, FloatField, Lookup
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import JobPostSearchDocument
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Full-text search over job posts
+# -----------------------------
+# Each backend owns its index DDL (`install`, run after every migrate so it
+# survives SQLite table rebuilds) and turns search terms into a filtered
+# queryset ordered by relevance. `search` returns None to fall back to
+# DRF's SearchFilter (LIKE scans).
+class BaseSearchBackend:
+    def install(self, connection):
+        pass
+
+    def search(self, queryset, terms):
+        return None
+
+
+class Match(Lookup):
+    """`document__match=<query>` → `<FTS table> MATCH <query>`."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+JobPostSearchDocument._meta.get_field('document').register_lookup(Match)
+
+
+class SqliteFTSBackend(BaseSearchBackend):
+    """FTS5 external-content table over api_jobpost, kept in sync by triggers."""
+
+    table = 'api_jobpost_fts'
+    # bm25 column weights: title, required_skills, description
+    weights = (10.0, 5.0, 1.0)
+    _available = None
+
+    def install(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_jobpost'")
+            triggers = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"title, required_skills, description, content='api_jobpost', content_rowid='id')"
+            )
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON api_jobpost BEGIN
+                    INSERT INTO {self.table}(rowid, title, required_skills, description)
+                    VALUES (new.id, new.title, new.required_skills, new.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON api_jobpost BEGIN
+                    INSERT INTO {self.table}({self.table}, rowid, title, required_skills, description)
+                    VALUES ('delete', old.id, old.title, old.required_skills, old.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {self.table}_au
+                AFTER UPDATE OF title, required_skills, description ON api_jobpost BEGIN
+                    INSERT INTO {self.table}({self.table}, rowid, title, required_skills, description)
+                    VALUES ('delete', old.id, old.title, old.required_skills, old.description);
+                    INSERT INTO {self.table}(rowid, title, required_skills, description)
+                    VALUES (new.id, new.title, new.required_skills, new.description);
+                END
+            """)
+            # Fresh index, or triggers lost when a migration rebuilt api_jobpost
+            if not {f'{self.table}_ai', f'{self.table}_ad', f'{self.table}_au'} <= triggers:
+                cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+        SqliteFTSBackend._available = True
+
+    def is_available(self):
+        # Only a positive answer is cached: a search that runs before post_migrate
+        # has created the table must not switch FTS off for the life of the process
+        if not SqliteFTSBackend._available:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [self.table])
+                SqliteFTSBackend._available = cursor.fetchone() is not None
+        return SqliteFTSBackend._available
+
+    def search(self, queryset, terms):
+        if not self.is_available():
+            return None
+
+        # Quote each term so user input can't inject FTS syntax; `*` = prefix match
+        query = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        weights = ', '.join(str(w) for w in self.weights)
+        # The lookup joins the FTS table (JobPostSearchDocument) under its own name,
+        # which is what bm25() needs as its first argument
+        return (
+            queryset.filter(search_document__document__match=query)
+            .annotate(search_rank=RawSQL(f'bm25("{self.table}", {weights})', [], output_field=FloatField()))
+            .order_by('search_rank', '-created_at')
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Weighted, generated tsvector column with a GIN index."""
+
+    def install(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                ALTER TABLE api_jobpost ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(required_skills, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+                ) STORED
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS api_jobpost_search_vector_gin ON api_jobpost USING GIN (search_vector)"
+            )
+
+    def search(self, queryset, terms):
+        query = ' '.join(terms)
+        return (
+            queryset.filter(RawSQL(
+                "api_jobpost.search_vector @@ websearch_to_tsquery('english', %s)", [query],
+                output_field=BooleanField(),
+            ))
+            .annotate(search_rank=RawSQL(
+                "ts_rank(api_jobpost.search_vector, websearch_to_tsquery('english', %s))", [query],
+                output_field=FloatField(),
+            ))
+            .order_by('-search_rank', '-created_at')
+        )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SqliteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'JOB_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, BaseSearchBackend)()
+
+
+def install_search_index(sender, using='default', **kwargs):
+    """post_migrate hook: create or repair the search index for the active backend."""
+    from django.db import connections
+
+    try:
+        get_search_backend().install(connections[using])
+    except OperationalError:
+        # e.g. SQLite built without FTS5: searches fall back to LIKE scans
+        logger.exception("Could not install the job search index")
+
+
+class JobSearchFilter(filters.SearchFilter):
+    """SearchFilter that ranks by relevance using the configured full-text backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        results = get_search_backend().search(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
@@ -1,6 +1,8 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework import serializers
+from .matching import content_hash, extract_text_from_pdf, read_file_bytes
 from .models import User, ResumeProfile, JobPost, Proposal, Message, ChatRoom
+from .pdf import PDFExtractionError
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -72,12 +74,51 @@ class ResumeProfileSerializer(serializers.ModelSerializer):
         model = ResumeProfile
         fields = ['id', 'user', 'skills', 'experience', 'education', 'resume_file']
 
+    def validate_resume_file(self, value):
+        """Reject PDFs that can't be read within the limits in api/pdf.py, with a machine-readable code."""
+        if not value:
+            return value
+        data = read_file_bytes(value)
+        try:
+            text = extract_text_from_pdf(data)
+        except PDFExtractionError as exc:
+            raise serializers.ValidationError(exc.message, code=exc.code)
+        # Handed to the model so ResumeProfile.save() sees the hash and doesn't extract again
+        self.extracted_resume = {'resume_text': text, 'resume_hash': content_hash(data)}
+        return value
+
+    def validate(self, attrs):
+        if attrs.get('resume_file'):
+            attrs.update(self.extracted_resume)
+        return attrs
+
 class JobPostSerializer(serializers.ModelSerializer):
     employer = RegisterSerializer(read_only=True)
+    avg_score = serializers.FloatField(read_only=True)
 
     class Meta:
         model = JobPost
-        fields = ['id', 'employer', 'title', 'description', 'required_skills', 'budget', 'status', 'created_at']
+        fields = [
+            'id', 'employer', 'title', 'description', 'required_skills', 'budget', 'status', 'created_at',
+            'proposal_count', 'shortlisted_count', 'avg_score',
+        ]
+        read_only_fields = ['proposal_count', 'shortlisted_count']
+
+
+class RecommendedJobSerializer(JobPostSerializer):
+    match_score = serializers.FloatField(read_only=True)
+
+    class Meta(JobPostSerializer.Meta):
+        fields = JobPostSerializer.Meta.fields + ['match_score']
+
+
+class CandidateSerializer(serializers.ModelSerializer):
+    freelancer = RegisterSerializer(source='user', read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ResumeProfile
+        fields = ['id', 'freelancer', 'skills', 'resume_file', 'score']
 
 
 class ProposalSerializer(serializers.ModelSerializer):
@@ -88,9 +129,9 @@ class ProposalSerializer(serializers.ModelSerializer):
         model = Proposal
         fields = [
             'id', 'freelancer', 'job', 'cover_letter',
-            'submitted_at', 'score', 'status', 'resume_file'
+            'submitted_at', 'score', 'score_status', 'status', 'resume_file'
         ]
-        read_only_fields = ['freelancer', 'submitted_at', 'score', 'resume_file']
+        read_only_fields = ['freelancer', 'submitted_at', 'score', 'score_status', 'resume_file']
 
     def update(self, instance, validated_data):
         new_status = validated_data.get('status', instance.status)
@@ -99,12 +140,10 @@ class ProposalSerializer(serializers.ModelSerializer):
         instance.status = new_status
         instance.save()
 
-        # ✅ If proposal is shortlisted, close the job
-        if new_status == 'shortlisted':
-            instance.job.status = 'Closed'  # or 'closed' if your choices are lowercase
-            instance.job.save()
-        elif new_status == 'rejected':
-            instance.job.status = 'Open'  # or 'closed' if your choices are lowercase
+        # ✅ Shortlisting closes the job, rejecting reopens it
+        job_status = Proposal.JOB_STATUS_FOR.get(new_status)
+        if job_status is not None:
+            instance.job.status = job_status
             instance.job.save()
 
         return instance
@@ -116,6 +155,21 @@ class ProposalSerializer(serializers.ModelSerializer):
             return None
 
 
+class ProposalStatusChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Proposal.STATUS_CHOICES)
+
+
+class BulkProposalStatusSerializer(serializers.Serializer):
+    updates = ProposalStatusChangeSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_updates(self, updates):
+        ids = [update['id'] for update in updates]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each proposal may appear only once.")
+        return updates
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender_full_name = serializers.CharField(source='sender.full_name', read_only=True)
 
@@ -132,3 +186,23 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         fields = ['id', 'job', 'job_title', 'freelancer', 'employer']
 
 
+class ChatInboxSerializer(ChatRoomSerializer):
+    """A room as listed in the inbox; the extra fields come from chat.annotate_inbox()."""
+    last_message_id = serializers.IntegerField(read_only=True)
+    last_message_sender = serializers.IntegerField(read_only=True)
+    last_message_preview = serializers.CharField(read_only=True)
+    last_message_at = serializers.DateTimeField(read_only=True)
+    last_read_message_id = serializers.IntegerField(read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ChatRoomSerializer.Meta):
+        fields = ChatRoomSerializer.Meta.fields + [
+            'last_message_id', 'last_message_sender', 'last_message_preview', 'last_message_at',
+            'last_read_message_id', 'unread_count',
+        ]
+
+
+class ReadMarkerSerializer(serializers.Serializer):
+    message_id = serializers.IntegerField(min_value=0, required=False)
+
+
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .cache import bump_version
+from .job_stats import adjust_job_stats, recompute_job_stats, state_of
+from .models import JobPost, Proposal, User
+
+
+# -----------------------------
+# Response cache invalidation
+# -----------------------------
+# Signals rather than save()/delete() overrides so cascade deletes (e.g. an
+# employer account removed with all its jobs) invalidate too.
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+def invalidate_job_listings(sender, **kwargs):
+    bump_version('jobs')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # e.g. ProfileView.put; see api/authentication.py
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_employer_listings(sender, instance, **kwargs):
+    # Job listings embed the employer's public profile
+    if instance.role == 'employer':
+        bump_version('jobs')
+
+
+# -----------------------------
+# Job proposal aggregates (see api/job_stats.py)
+# -----------------------------
+@receiver(post_save, sender=Proposal)
+def count_saved_proposal(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    after = state_of(instance)
+    before = getattr(instance, '_counted_state', None)
+    if created:
+        adjust_job_stats(instance.job_id, after=after)
+    elif before is None or None in before:
+        # Not loaded from the database, or loaded with deferred fields
+        recompute_job_stats([instance.job_id])
+    else:
+        # Updates never write the score fields (see Proposal.save)
+        after = (instance.status,) + before[1:]
+        adjust_job_stats(instance.job_id, before, after)
+    instance._counted_state = after
+
+
+@receiver(pre_delete, sender=Proposal)
+def read_deleted_proposal(sender, instance, origin=None, **kwargs):
+    # Count what the row holds rather than what a possibly stale instance says;
+    # nothing to count when the job is being deleted along with it
+    if isinstance(origin, JobPost) and origin.pk == instance.job_id:
+        instance._deleted_state = None
+    else:
+        instance._deleted_state = (
+            Proposal.objects.filter(pk=instance.pk).values_list('status', 'score_status', 'score').first()
+        )
+
+
+@receiver(post_delete, sender=Proposal)
+def count_deleted_proposal(sender, instance, **kwargs):
+    before = getattr(instance, '_deleted_state', None)
+    if before is not None:
+        adjust_job_stats(instance.job_id, before=before)
@@ -0,0 +1,106 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .job_stats import set_score_state
+from .models import Proposal, ScoringJob
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Proposal scoring queue (database-backed, no broker)
+# -----------------------------
+def enqueue_scoring(proposal):
+    """Queue a proposal for scoring and mark its score as pending."""
+    if proposal.score_status != 'pending':
+        set_score_state(proposal.pk, 'pending')
+        proposal.score_status = 'pending'
+    return ScoringJob.objects.create(proposal=proposal)
+
+
+def reclaim_stale_jobs(timeout, max_attempts):
+    """
+    Jobs left 'running' longer than `timeout` seconds belong to a worker that
+    died or hung: put them back in the queue, or fail them if out of attempts.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = ScoringJob.objects.filter(status='running', locked_at__lt=cutoff)
+
+    for job in stale:
+        if job.attempts >= max_attempts:
+            _fail(job, f"Timed out after {timeout}s")
+        else:
+            ScoringJob.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(
+                status='queued', locked_at=None, last_error=f"Timed out after {timeout}s",
+            )
+
+
+def claim_jobs(limit):
+    """
+    Atomically claim up to `limit` due jobs. The conditional UPDATE means two
+    workers can never claim the same job, even on SQLite.
+    """
+    now = timezone.now()
+    candidates = ScoringJob.objects.filter(status='queued', run_after__lte=now).values_list('pk', flat=True)[:limit]
+
+    claimed = []
+    for pk in candidates:
+        if ScoringJob.objects.filter(pk=pk, status='queued').update(
+            status='running', locked_at=now, attempts=F('attempts') + 1,
+        ):
+            claimed.append(pk)
+    return list(ScoringJob.objects.filter(pk__in=claimed).select_related('proposal'))
+
+
+def run_job(job, max_attempts):
+    """Score one claimed job; on error, retry with exponential backoff."""
+    from .matching import score_proposal
+
+    close_old_connections()
+    try:
+        proposal = (
+            Proposal.objects.select_related('job', 'freelancer__resume').prefetch_related('job__skill_tags')
+            .get(pk=job.proposal_id)
+        )
+        score = score_proposal(proposal)
+
+        with transaction.atomic():
+            # Only the worker that still holds the lock may finish the job
+            if not ScoringJob.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(
+                status='done', locked_at=None, last_error='',
+            ):
+                return False
+            set_score_state(proposal.pk, 'done', score)
+        return True
+
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Scoring job %s failed (attempt %s)", job.pk, job.attempts)
+        if job.attempts >= max_attempts:
+            _fail(job, error)
+        else:
+            # A job reclaimed and claimed again meanwhile belongs to the new worker
+            ScoringJob.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(
+                status='queued',
+                locked_at=None,
+                last_error=error,
+                run_after=timezone.now() + timedelta(seconds=2 ** job.attempts),
+            )
+        return False
+
+    finally:
+        close_old_connections()
+
+
+def _fail(job, error):
+    with transaction.atomic():
+        if not ScoringJob.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at).update(
+            status='failed', locked_at=None, last_error=error,
+        ):
+            return
+        set_score_state(job.proposal_id, 'failed')
@@ -1,3 +1,1615 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from importlib import import_module
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps as django_apps
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import job_stats, metrics, middleware, nlp
+from .authentication import user_cache_key
+from .benchmark import build_scenarios, compare, run_benchmarks
+from .cache import version_key
+from .candidate_index import resume_matrix
+from .chat import annotate_inbox, room_state, waiter_slots
+from .job_index import open_jobs
+from .job_stats import set_score_state
+from .management.commands import rescore_proposals
+from .matching import MatchingEngine, content_hash, engine, resume_source_text
+from .matching_benchmark import compare_matching, run_matching_benchmark, word_tokens
+from .models import User, ResumeProfile, JobPost, Proposal, Message, ChatRoom, ScoringJob, Skill
+from .pdf import PDFExtractionError, PDFExtractor
+from .search import SqliteFTSBackend
+from .serializers import CustomTokenObtainPairSerializer, ResumeProfileSerializer
+from .tasks import claim_jobs, enqueue_scoring, reclaim_stale_jobs, run_job
+from .views import JobPagination
+from core.asgi import application
+
+
+# -----------------------------
+# Query budgets for list endpoints
+# -----------------------------
+class QueryBudgetTests(TestCase):
+    """
+    Every list endpoint must load its rows and their related data in a fixed
+    number of queries. Each endpoint is measured at 1, 10 and 100 rows; the
+    count must not grow with the row count and must stay within its budget.
+    """
+
+    SIZES = (1, 10, 100)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+
+    def make_freelancers(self, count):
+        users = User.objects.bulk_create([
+            User(email=f'freelancer{i}@example.com', username=f'freelancer{i}', role='freelancer')
+            for i in range(count)
+        ])
+        # bulk_create skips ResumeProfile.save(), so no NLP runs here
+        ResumeProfile.objects.bulk_create([
+            ResumeProfile(user=user, skills='python, django', resume_file=f'resumes/{user.username}.pdf')
+            for user in users
+        ])
+        return users
+
+    def make_jobs(self, count, employer=None):
+        return JobPost.objects.bulk_create([
+            JobPost(employer=employer or self.employer, title=f'Job {i}', description='Build things',
+                    required_skills='python, django', budget=100)
+            for i in range(count)
+        ])
+
+    def count_queries(self, url, user=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return len(queries)
+
+    def assertQueryBudget(self, budget, measure):
+        """`measure(size)` builds `size` rows and returns the queries its request ran."""
+        counts = []
+        for size in self.SIZES:
+            with self.subTest(rows=size):
+                counts.append(measure(size))
+                self.assertLessEqual(counts[-1], budget)
+        self.assertEqual(len(set(counts)), 1, f"Query count grows with rows: {dict(zip(self.SIZES, counts))}")
+
+    def test_job_list(self):
+        def measure(size):
+            with self.captureOnCommitCallbacks(execute=True):  # the cache version bump
+                JobPost.objects.all().delete()
+            self.make_jobs(size)
+            return self.count_queries('/api/v1/jobs/?page_size=100')
+        # count + page (the cache version lives in the cache)
+        self.assertQueryBudget(2, measure)
+
+    def test_job_list_keyset(self):
+        def measure(size):
+            JobPost.objects.all().delete()
+            self.make_jobs(size)
+            return self.count_queries('/api/v1/jobs/?cursor=&page_size=100')
+        self.assertQueryBudget(2, measure)
+
+    def test_employer_job_list(self):
+        def measure(size):
+            JobPost.objects.all().delete()
+            self.make_jobs(size)
+            return self.count_queries(f'/api/v1/jobs/employer/{self.employer.id}/')
+        self.assertQueryBudget(2, measure)
+
+    def test_job_proposal_list(self):
+        def measure(size):
+            User.objects.filter(role='freelancer').delete()
+            JobPost.objects.all().delete()
+            job = self.make_jobs(1)[0]
+            Proposal.objects.bulk_create([
+                Proposal(job=job, freelancer=user, cover_letter='Hire me', score_status='done')
+                for user in self.make_freelancers(size)
+            ])
+            return self.count_queries(f'/api/v1/jobs/{job.id}/proposals/', self.employer)
+        self.assertQueryBudget(2, measure)
+
+    def test_freelancer_proposal_list(self):
+        freelancer = self.make_freelancers(1)[0]
+
+        def measure(size):
+            JobPost.objects.all().delete()
+            Proposal.objects.bulk_create([
+                Proposal(job=job, freelancer=freelancer, cover_letter='Hire me', score_status='done')
+                for job in self.make_jobs(size)
+            ])
+            return self.count_queries('/api/v1/proposals/freelancer/', freelancer)
+        self.assertQueryBudget(1, measure)
+
+    def test_chat_room_list(self):
+        def measure(size):
+            User.objects.filter(role='freelancer').delete()
+            JobPost.objects.all().delete()
+            job = self.make_jobs(1)[0]
+            ChatRoom.objects.bulk_create([
+                ChatRoom(job=job, employer=self.employer, freelancer=user)
+                for user in self.make_freelancers(size)
+            ])
+            return self.count_queries('/api/v1/chat/rooms/', self.employer)
+        self.assertQueryBudget(1, measure)
+
+    def test_message_list(self):
+        freelancer = self.make_freelancers(1)[0]
+        room = ChatRoom.objects.create(job=self.make_jobs(1)[0], employer=self.employer, freelancer=freelancer)
+
+        def measure(size):
+            Message.objects.all().delete()
+            Message.objects.bulk_create([
+                Message(room=room, sender=self.employer if i % 2 else freelancer, content=f'Message {i}')
+                for i in range(size)
+            ])
+            return self.count_queries(f'/api/v1/chat/rooms/{room.id}/messages/', self.employer)
+        # room state for the ETag + the messages
+        self.assertQueryBudget(2, measure)
+
+
+# -----------------------------
+# spaCy model loading
+# -----------------------------
+class NLPLoadingTests(SimpleTestCase):
+
+    def test_loaded_once_without_unused_components(self):
+        import spacy
+
+        calls = []
+
+        def load(name, **kwargs):
+            calls.append((name, kwargs))
+            time.sleep(0.01)  # widen the window for a second load
+            return object()
+
+        self.addCleanup(setattr, spacy, 'load', spacy.load)
+        self.addCleanup(setattr, nlp, '_nlp', nlp._nlp)
+        spacy.load, nlp._nlp = load, None
+
+        threads = [threading.Thread(target=nlp.get_nlp) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIs(nlp.get_nlp(), nlp.preload_nlp())
+        self.assertEqual(calls, [(settings.NLP_MODEL_NAME, {'exclude': nlp.EXCLUDED_COMPONENTS})])
+        self.assertEqual(nlp.EXCLUDED_COMPONENTS, ['ner', 'lemmatizer'])
+
+
+# -----------------------------
+# Stored resume skill tokens
+# -----------------------------
+class ResumeSkillTokenTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.tokenized = []
+
+        def tokenize(text):
+            self.tokenized.append(text)
+            return word_tokens(text)
+
+        for name, value in (('extract', lambda data: data.decode()), ('tokenizer', tokenize)):
+            self.addCleanup(setattr, engine, name, getattr(engine, name))
+            setattr(engine, name, value)
+
+        user = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        self.profile = ResumeProfile.objects.create(user=user, skills='python')
+
+    def assertTokensFor(self, text):
+        stored = ResumeProfile.objects.get(pk=self.profile.pk)
+        self.assertEqual(resume_source_text(stored), text)
+        self.assertEqual(stored.skill_tokens, sorted(word_tokens(text)))
+        self.assertEqual(stored.tokens_hash, content_hash(text.encode()))
+
+    def test_built_on_create(self):
+        self.assertEqual(self.tokenized, ['python   '])
+        self.assertTokensFor('python   ')
+
+    def test_skill_and_text_edits_refresh_tokens(self):
+        self.profile.skills = 'python, django'
+        self.profile.save()
+        self.assertTokensFor('python, django   ')
+
+        self.profile.experience = 'Backend work'
+        self.profile.save(update_fields=['experience'])
+        self.assertTokensFor('python, django backend work  ')
+        self.assertEqual(len(self.tokenized), 3)
+
+    def test_resume_upload_refreshes_tokens(self):
+        self.profile.resume_file = SimpleUploadedFile('resume.pdf', b'Django developer')
+        self.profile.save()
+        self.assertTokensFor('python   django developer')
+
+    def test_unchanged_saves_skip_the_tokenizer(self):
+        self.profile.save()
+        self.profile.save(update_fields=['skills'])
+        ResumeProfile.objects.get(pk=self.profile.pk).save()
+        self.assertEqual(len(self.tokenized), 1)
+
+
+# -----------------------------
+# Normalized skill tags
+# -----------------------------
+class SkillTagTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        original, engine.tokenizer = engine.tokenizer, word_tokens  # ResumeProfile.save() tokenizes
+        self.addCleanup(setattr, engine, 'tokenizer', original)
+
+    def make_job(self, required_skills, **fields):
+        return JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                      required_skills=required_skills, budget=100, **fields)
+
+    def tags(self, obj):
+        return set(obj.skill_tags.values_list('name', flat=True))
+
+    def test_tags_are_normalized_and_shared(self):
+        job = self.make_job(' Django, python ,DJANGO,,  React ')
+        self.assertEqual(self.tags(job), {'django', 'python', 'react'})
+        other = self.make_job('Python')
+        self.assertEqual(self.tags(other), {'python'})
+        self.assertEqual(Skill.objects.count(), 3)
+
+    def test_editing_skills_resyncs(self):
+        job = self.make_job('django, python')
+        job = JobPost.objects.get(pk=job.pk)
+        job.required_skills = 'python, rust'
+        job.save()
+        self.assertEqual(self.tags(job), {'python', 'rust'})
+
+        # Saves that leave the text alone don't touch the join table
+        job = JobPost.objects.get(pk=job.pk)
+        job.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+            job.save(update_fields=['budget'])
+        self.assertFalse([q for q in queries if 'api_skill' in q['sql'] or 'skill_tags' in q['sql']])
+
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        profile = ResumeProfile.objects.create(user=freelancer, skills='Go, SQL')
+        profile.skills = 'go, kotlin'
+        profile.save(update_fields=['skills'])
+        self.assertEqual(self.tags(profile), {'go', 'kotlin'})
+
+    def test_data_migration_tags_existing_rows(self):
+        migration = import_module('api.migrations.0010_populate_skill_tags')
+        job, = JobPost.objects.bulk_create([JobPost(employer=self.employer, title='Job', description='Build things',
+                                                    required_skills='Django, Vue ', budget=100)])
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        profile, = ResumeProfile.objects.bulk_create([ResumeProfile(user=freelancer, skills='vue,CSS')])
+        migration.populate_skill_tags(django_apps, None)
+        self.assertEqual(self.tags(job), {'django', 'vue'})
+        self.assertEqual(self.tags(profile), {'vue', 'css'})
+        self.assertEqual(Skill.objects.count(), 3)
+
+    def test_skill_filter(self):
+        django_job = self.make_job('Django, python')
+        rust_job = self.make_job('rust')
+        self.make_job('php')
+        response = self.client.get('/api/v1/jobs/', {'skill': ' DJANGO,rust'})
+        self.assertEqual({job['id'] for job in response.json()['results']}, {django_job.pk, rust_job.pk})
+
+    def test_scores_from_prefetched_tags(self):
+        job = self.make_job('python, django')
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        profile = ResumeProfile(user=freelancer, skills='python', skill_tokens=['python'])
+        profile.tokens_hash = content_hash(resume_source_text(profile).encode())
+        ResumeProfile.objects.bulk_create([profile])
+        Proposal.objects.create(job=job, freelancer=freelancer, cover_letter='Hire me')
+
+        proposal = (
+            Proposal.objects.select_related('job', 'freelancer__resume').prefetch_related('job__skill_tags').get()
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(engine.score_proposal(proposal), 50.0)
+        self.assertEqual(len(queries), 0)
+
+        # The join table is the source of truth, not a re-split of the text
+        job.skill_tags.set(Skill.resolve({'python'}))
+        proposal = Proposal.objects.select_related('job', 'freelancer__resume').get()
+        self.assertEqual(engine.score_proposal(proposal), 100.0)
+
+
+# -----------------------------
+# Sandboxed PDF extraction
+# -----------------------------
+def make_pdf(*pages):
+    import fitz
+
+    with fitz.open() as doc:
+        for text in pages:
+            doc.new_page().insert_text((72, 72), text)
+        return doc.tobytes()
+
+
+class PDFExtractionTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.extractor = PDFExtractor(workers=1, timeout=15, max_pages=2, max_bytes=50_000, memory_limit=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.extractor.pool is not None:
+            cls.extractor.pool.shutdown()
+        super().tearDownClass()
+
+    def assertCode(self, code, data):
+        with self.assertRaises(PDFExtractionError) as raised:
+            self.extractor.extract(data)
+        self.assertEqual(raised.exception.code, code)
+
+    def test_text(self):
+        self.assertIn('Python developer', self.extractor.extract(make_pdf('Python developer', 'Django')))
+
+    def test_limits(self):
+        self.assertCode(PDFExtractionError.TOO_LARGE, b'%PDF' + b'0' * 50_000)
+        self.assertCode(PDFExtractionError.TOO_MANY_PAGES, make_pdf('one', 'two', 'three'))
+        self.assertCode(PDFExtractionError.INVALID, b'not a pdf')
+
+    def test_busy(self):
+        extractor = PDFExtractor(workers=1, timeout=0.1, max_pages=2, max_bytes=50_000, memory_limit=0)
+        extractor.slots.acquire()
+        with self.assertRaises(PDFExtractionError) as raised:
+            extractor.extract(make_pdf('text'))
+        self.assertEqual(raised.exception.code, PDFExtractionError.BUSY)
+
+
+class ResumeTextTests(SimpleTestCase):
+
+    def profile(self, data):
+        return ResumeProfile(resume_file=SimpleUploadedFile('resume.pdf', data, content_type='application/pdf'))
+
+    def extract_with(self, extract):
+        original, engine.extract = engine.extract, extract
+        self.addCleanup(setattr, engine, 'extract', original)
+
+    def failing(self, code):
+        def extract(data):
+            raise PDFExtractionError(code, "failed")
+        return extract
+
+    def test_transient_errors_are_retried(self):
+        profile = self.profile(b'%PDF resume')
+        for code in PDFExtractionError.TRANSIENT:
+            self.extract_with(self.failing(code))
+            with self.assertLogs('api.models', 'WARNING'):
+                self.assertTrue(profile.refresh_resume_text())
+            self.assertEqual((profile.resume_text, profile.resume_hash), ('', ''))
+
+        self.extract_with(lambda data: 'Python developer')
+        self.assertTrue(profile.refresh_resume_text())
+        self.assertEqual(profile.resume_text, 'Python developer')
+        self.assertEqual(profile.resume_hash, content_hash(b'%PDF resume'))
+
+    def test_broken_files_are_not_retried(self):
+        profile = self.profile(b'not a pdf')
+        self.extract_with(self.failing(PDFExtractionError.INVALID))
+        with self.assertLogs('api.models', 'WARNING'):
+            profile.refresh_resume_text()
+        self.assertEqual(profile.resume_hash, content_hash(b'not a pdf'))
+        self.assertFalse(profile.refresh_resume_text())
+
+    def test_upload_errors_carry_the_code(self):
+        self.extract_with(self.failing(PDFExtractionError.TOO_MANY_PAGES))
+        serializer = ResumeProfileSerializer(data={
+            'resume_file': SimpleUploadedFile('resume.pdf', b'%PDF resume', content_type='application/pdf'),
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['resume_file'][0].code, PDFExtractionError.TOO_MANY_PAGES)
+
+
+class BackfillResumeTextTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        for name, value in (('extract', lambda data: data.decode()), ('tokenizer', word_tokens)):
+            self.addCleanup(setattr, engine, name, getattr(engine, name))
+            setattr(engine, name, value)
+
+        user = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        # bulk_create skips ResumeProfile.save(): a profile uploaded before text extraction existed
+        self.profile, = ResumeProfile.objects.bulk_create([ResumeProfile(
+            user=user, skills='python', resume_file=SimpleUploadedFile('resume.pdf', b'Django developer'),
+        )])
+
+    def backfill(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('backfill_resume_text', stdout=out, stderr=err)
+        self.profile.refresh_from_db()
+        return out.getvalue(), err.getvalue()
+
+    def test_extracts_text_and_tokens(self):
+        out, _ = self.backfill()
+        self.assertIn('Updated 1 resumes, 0 unchanged, 0 missing files, 0 failed', out)
+        self.assertEqual(self.profile.resume_text, 'Django developer')
+        self.assertEqual(set(self.profile.skill_tokens), word_tokens(resume_source_text(self.profile)))
+        self.assertIn('django developer', self.profile.skill_tokens)
+        self.assertEqual(self.profile.tokens_hash, content_hash(resume_source_text(self.profile).encode()))
+        self.assertIn('0 failed', self.backfill()[0])
+
+    def test_tokenizer_failures_are_reported_and_retried(self):
+        def tokenize(text):
+            raise OSError("model unavailable")
+        engine.tokenizer = tokenize
+        out, err = self.backfill()
+        self.assertIn('Updated 0 resumes, 0 unchanged, 0 missing files, 1 failed', out)
+        self.assertIn('model unavailable', err)
+        self.assertEqual((self.profile.resume_text, self.profile.skill_tokens, self.profile.tokens_hash),
+                         ('Django developer', [], ''))
+
+        engine.tokenizer = word_tokens
+        self.assertIn('Updated 1 resumes', self.backfill()[0])
+        self.assertIn('django developer', self.profile.skill_tokens)
+
+
+# -----------------------------
+# Proposal scoring queue
+# -----------------------------
+class ScoringQueueTests(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        self.job = JobPost.objects.create(employer=employer, title='Job', description='Build things',
+                                          required_skills='python, django', budget=100)
+        profile = ResumeProfile(user=freelancer, skills='python', skill_tokens=['python'])
+        profile.tokens_hash = content_hash(resume_source_text(profile).encode())
+        # bulk_create skips ResumeProfile.save(), so no NLP runs here
+        self.profile, = ResumeProfile.objects.bulk_create([profile])
+        self.proposal = Proposal.objects.create(job=self.job, freelancer=freelancer, cover_letter='Hire me')
+        self.scoring_job = enqueue_scoring(self.proposal)
+
+    def break_tokenizer(self):
+        def tokenize(text):
+            raise OSError("model unavailable")
+        original, engine.tokenizer = engine.tokenizer, tokenize
+        self.addCleanup(setattr, engine, 'tokenizer', original)
+
+    def run_claimed(self, max_attempts=3):
+        job, = claim_jobs(10)
+        return run_job(job, max_attempts)
+
+    def run_failing(self, max_attempts=3):
+        with self.assertLogs('api.tasks', 'ERROR'):
+            return self.run_claimed(max_attempts)
+
+    def refresh(self):
+        self.scoring_job.refresh_from_db()
+        self.proposal.refresh_from_db()
+
+    def test_claimed_once(self):
+        self.assertEqual([job.pk for job in claim_jobs(10)], [self.scoring_job.pk])
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_scores_from_stored_tokens(self):
+        self.assertTrue(self.run_claimed())
+        self.refresh()
+        self.assertEqual((self.scoring_job.status, self.proposal.score_status, self.proposal.score), ('done', 'done', 50.0))
+
+    def test_stale_tokens_that_cannot_be_rebuilt_are_retried(self):
+        self.break_tokenizer()
+        ResumeProfile.objects.filter(pk=self.profile.pk).update(tokens_hash='')
+
+        self.assertFalse(self.run_failing())
+        self.refresh()
+        self.assertEqual((self.scoring_job.status, self.scoring_job.attempts), ('queued', 1))
+        self.assertGreater(self.scoring_job.run_after, timezone.now())
+        self.assertIn('model unavailable', self.scoring_job.last_error)
+        self.assertEqual(self.proposal.score_status, 'pending')
+        self.assertEqual(claim_jobs(10), [])  # backing off
+
+        ScoringJob.objects.filter(pk=self.scoring_job.pk).update(run_after=timezone.now())
+        self.assertFalse(self.run_failing(max_attempts=2))
+        self.refresh()
+        self.assertEqual((self.scoring_job.status, self.proposal.score_status), ('failed', 'failed'))
+
+    def test_stuck_jobs_are_reclaimed(self):
+        claim_jobs(10)
+        ScoringJob.objects.filter(pk=self.scoring_job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        reclaim_stale_jobs(timeout=60, max_attempts=3)
+        self.refresh()
+        self.assertEqual((self.scoring_job.status, self.scoring_job.locked_at), ('queued', None))
+
+        claim_jobs(10)
+        ScoringJob.objects.filter(pk=self.scoring_job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        reclaim_stale_jobs(timeout=60, max_attempts=2)
+        self.refresh()
+        self.assertEqual((self.scoring_job.status, self.proposal.score_status), ('failed', 'failed'))
+
+    def test_stale_worker_cannot_retry_or_fail_a_reclaimed_job(self):
+        self.break_tokenizer()
+        ResumeProfile.objects.filter(pk=self.profile.pk).update(tokens_hash='')
+        stale, = claim_jobs(10)
+        ScoringJob.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        stale.refresh_from_db()
+        reclaim_stale_jobs(timeout=60, max_attempts=3)
+        current, = claim_jobs(10)
+
+        # The hung worker wakes up and errors out: both its retry and its final failure are fenced off
+        for max_attempts in (3, 1):
+            with self.assertLogs('api.tasks', 'ERROR'):
+                self.assertFalse(run_job(stale, max_attempts))
+            self.refresh()
+            self.assertEqual((self.scoring_job.status, self.scoring_job.locked_at), ('running', current.locked_at))
+            self.assertEqual(self.proposal.score_status, 'pending')
+
+
+# -----------------------------
+# Job proposal aggregates
+# -----------------------------
+class JobStatsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                          required_skills='python', budget=100)
+        self.proposals = [
+            Proposal.objects.create(
+                job=self.job, cover_letter='Hire me',
+                freelancer=User.objects.create(email=f'f{i}@example.com', username=f'f{i}', role='freelancer'),
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.employer)
+
+    def stats(self):
+        job = JobPost.objects.get(pk=self.job.pk)
+        return job.proposal_count, job.shortlisted_count, job.scored_count, job.avg_score
+
+    def test_created_scored_and_deleted(self):
+        self.assertEqual(self.stats(), (3, 0, 0, None))
+        set_score_state(self.proposals[0].pk, 'done', 80.0)
+        set_score_state(self.proposals[1].pk, 'done', 40.0)
+        self.assertEqual(self.stats(), (3, 0, 2, 60.0))
+        set_score_state(self.proposals[1].pk, 'done', 60.0)  # rescored
+        self.assertEqual(self.stats(), (3, 0, 2, 70.0))
+
+        # A stale instance (loaded before scoring) neither clobbers the score nor miscounts
+        self.proposals[0].status = 'shortlisted'
+        self.proposals[0].save()
+        self.assertEqual(Proposal.objects.get(pk=self.proposals[0].pk).score, 80.0)
+        self.assertEqual(self.stats(), (3, 1, 2, 70.0))
+        self.proposals[0].delete()
+        self.assertEqual(self.stats(), (2, 0, 1, 60.0))
+
+    def test_status_update_keeps_the_count(self):
+        # The proposal save increments shortlisted_count, then the (stale) job is saved
+        response = self.client.patch(f'/api/v1/proposals/{self.proposals[0].pk}/update/',
+                                     {'status': 'shortlisted'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(self.stats(), (3, 1, 0, None))
+        self.assertEqual(JobPost.objects.get(pk=self.job.pk).status, 'Closed')
+
+    def test_job_edits_keep_the_counts(self):
+        stale = JobPost.objects.get(pk=self.job.pk)
+        Proposal.objects.create(
+            job=self.job, freelancer=User.objects.create(email='late@example.com', username='late', role='freelancer'),
+            cover_letter='Hire me',
+        )
+        stale.title = 'Renamed'
+        stale.save()
+        response = self.client.patch(f'/api/v1/jobs/{self.job.pk}/', {'budget': '150.00'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(self.stats(), (4, 0, 0, None))
+        self.assertEqual(JobPost.objects.get(pk=self.job.pk).title, 'Renamed')
+
+    def test_bulk_status(self):
+        response = self.client.patch(f'/api/v1/jobs/{self.job.pk}/proposals/status/', {'updates': [
+            {'id': self.proposals[0].pk, 'status': 'shortlisted'},
+            {'id': self.proposals[1].pk, 'status': 'shortlisted'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(self.stats(), (3, 2, 0, None))
+
+    def test_repair(self):
+        set_score_state(self.proposals[0].pk, 'done', 50.0)
+        JobPost.objects.filter(pk=self.job.pk).update(proposal_count=0, scored_count=7, score_total=1.0)
+        call_command('repair_job_stats', stdout=io.StringIO())
+        self.assertEqual(self.stats(), (3, 0, 1, 50.0))
+
+
+class RescoreProposalsTests(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.jobs = JobPost.objects.bulk_create([
+            JobPost(employer=employer, title=f'Job {i}', description='Build things',
+                    required_skills='python, django', budget=100)
+            for i in range(3)
+        ])
+        for job in self.jobs:
+            job.sync_skill_tags()  # bulk_create skips JobPost.save()
+        users = User.objects.bulk_create([
+            User(email=f'freelancer{i}@example.com', username=f'freelancer{i}', role='freelancer')
+            for i in range(4)
+        ])
+        fresh = ResumeProfile(user=users[0], skills='python, django', skill_tokens=['python', 'django'])
+        fresh.tokens_hash = content_hash(resume_source_text(fresh).encode())
+        ResumeProfile.objects.bulk_create([
+            fresh,
+            ResumeProfile(user=users[1], skills='python', skill_tokens=[], tokens_hash='old'),
+            ResumeProfile(user=users[2], skills='django', skill_tokens=[], tokens_hash='old'),
+        ])  # users[3] has no resume
+        Proposal.objects.bulk_create([
+            Proposal(job=job, freelancer=user, cover_letter='Hire me') for job in self.jobs for user in users
+        ])
+
+        self.pipe_calls = []
+
+        def extract_tokens_batch(texts, n_process=1):
+            self.pipe_calls.append(n_process)
+            for text in texts:
+                yield {word.strip(',') for word in text.split()}
+
+        self.addCleanup(setattr, rescore_proposals, 'extract_tokens_batch', rescore_proposals.extract_tokens_batch)
+        rescore_proposals.extract_tokens_batch = extract_tokens_batch
+
+    def test_stale_resumes_share_one_pipe(self):
+        call_command('rescore_proposals', chunk_size=1, processes=4, stdout=io.StringIO())
+        self.assertEqual(self.pipe_calls, [4])
+        self.assertEqual(
+            sorted(Proposal.objects.filter(job=self.jobs[0]).values_list('score', flat=True)),
+            [0, 50.0, 50.0, 100.0],
+        )
+        self.assertEqual(ResumeProfile.objects.filter(tokens_hash='old').count(), 0)
+        for job in JobPost.objects.filter(pk__in=[job.pk for job in self.jobs]):
+            self.assertEqual((job.proposal_count, job.scored_count, job.score_total), (4, 4, 200.0))
+
+    def test_proposals_with_pending_jobs_are_left_to_the_worker(self):
+        queued, running, finished = Proposal.objects.filter(job=self.jobs[0]).order_by('pk')[:3]
+        enqueue_scoring(queued)
+        enqueue_scoring(running)
+        claim_jobs(1)
+        ScoringJob.objects.create(proposal=finished, status='done')
+        out = io.StringIO()
+        call_command('rescore_proposals', stdout=out)
+        self.assertIn('2 proposals skipped', out.getvalue())
+
+        statuses = dict(Proposal.objects.filter(job=self.jobs[0]).values_list('pk', 'score_status'))
+        self.assertEqual((statuses[queued.pk], statuses[running.pk], statuses[finished.pk]), ('pending', 'pending', 'done'))
+        self.assertEqual(list(ScoringJob.objects.order_by('pk').values_list('status', flat=True)),
+                         ['running', 'queued', 'done'])
+
+    def test_up_to_date_resumes_skip_the_pipe(self):
+        ResumeProfile.objects.filter(tokens_hash='old').delete()
+        call_command('rescore_proposals', stdout=io.StringIO())
+        self.assertEqual(self.pipe_calls, [])
+
+    def test_recompute_in_batches(self):
+        self.addCleanup(setattr, job_stats, 'RECOMPUTE_BATCH_SIZE', job_stats.RECOMPUTE_BATCH_SIZE)
+        job_stats.RECOMPUTE_BATCH_SIZE = 2
+        JobPost.objects.update(proposal_count=0)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(job_stats.recompute_job_stats(job.pk for job in self.jobs), 3)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "api_jobpost"')]), 2)
+        self.assertEqual(set(JobPost.objects.values_list('proposal_count', flat=True)), {4})
+
+
+# -----------------------------
+# Bulk proposal status and export
+# -----------------------------
+class ProposalBulkStatusTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                          required_skills='python', budget=100)
+        freelancers = User.objects.bulk_create([
+            User(email=f'f{i}@example.com', username=f'f{i}', role='freelancer', full_name=f'Freelancer {i}')
+            for i in range(3)
+        ])
+        self.proposals = Proposal.objects.bulk_create([
+            Proposal(job=self.job, freelancer=user, cover_letter=letter)
+            for user, letter in zip(freelancers, ['Hire me', '=HYPERLINK("http://evil.example")', '@SUM(A1)'])
+        ])
+        self.client.force_authenticate(self.employer)
+
+    def patch_status(self, *updates):
+        return self.client.patch(f'/api/v1/jobs/{self.job.pk}/proposals/status/', {'updates': [
+            {'id': proposal.pk, 'status': status} for proposal, status in updates
+        ]}, format='json')
+
+    def test_bulk_status_sets_the_last_job_status(self):
+        response = self.patch_status((self.proposals[0], 'shortlisted'), (self.proposals[1], 'rejected'))
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(response.json(), {'updated': 2, 'job_status': 'Open'})
+
+        response = self.patch_status((self.proposals[1], 'rejected'), (self.proposals[2], 'shortlisted'))
+        self.assertEqual(response.json(), {'updated': 1, 'job_status': 'Closed'})
+        self.assertEqual(JobPost.objects.get(pk=self.job.pk).status, 'Closed')
+        self.assertEqual(
+            dict(Proposal.objects.values_list('pk', 'status')),
+            {self.proposals[0].pk: 'shortlisted', self.proposals[1].pk: 'rejected',
+             self.proposals[2].pk: 'shortlisted'},
+        )
+
+    def test_bulk_status_rejects_unknown_ids(self):
+        other_job = JobPost.objects.create(employer=self.employer, title='Other', description='Other',
+                                           required_skills='python', budget=100)
+        foreign = Proposal.objects.create(job=other_job, freelancer=self.proposals[0].freelancer,
+                                          cover_letter='Hire me')
+        response = self.patch_status((self.proposals[0], 'shortlisted'), (foreign, 'shortlisted'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['ids'], [foreign.pk])
+        # Nothing was applied
+        self.assertEqual(Proposal.objects.get(pk=self.proposals[0].pk).status, 'pending')
+        self.assertEqual(JobPost.objects.get(pk=self.job.pk).status, 'Open')
+
+    def test_bulk_status_is_for_the_job_owner(self):
+        self.client.force_authenticate(User.objects.create(email='other@example.com', username='other',
+                                                           role='employer'))
+        self.assertEqual(self.patch_status((self.proposals[0], 'shortlisted')).status_code, 403)
+        self.assertEqual(Proposal.objects.get(pk=self.proposals[0].pk).status, 'pending')
+
+class ProposalExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                          required_skills='python', budget=100)
+        freelancers = User.objects.bulk_create([
+            User(email=f'f{i}@example.com', username=f'f{i}', role='freelancer', full_name=f'Freelancer {i}')
+            for i in range(3)
+        ])
+        self.proposals = Proposal.objects.bulk_create([
+            Proposal(job=self.job, freelancer=user, cover_letter=letter)
+            for user, letter in zip(freelancers, ['Hire me', '=HYPERLINK("http://evil.example")', '@SUM(A1)'])
+        ])
+        self.client.force_authenticate(self.employer)
+
+    def export(self, export_format, job=None):
+        return self.client.get(f'/api/v1/jobs/{(job or self.job).pk}/proposals/export.{export_format}')
+
+    def test_csv_export(self):
+        response = self.export('csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['email'] for row in rows], ['f2@example.com', 'f1@example.com', 'f0@example.com'])
+        self.assertEqual(rows[2]['full_name'], 'Freelancer 0')
+        # Formulas in user input are neutralised for spreadsheet apps
+        self.assertEqual([row['cover_letter'] for row in rows],
+                         ["'@SUM(A1)", '\'=HYPERLINK("http://evil.example")', 'Hire me'])
+
+    def test_ndjson_export(self):
+        response = self.export('ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record['id'] for record in records], [p.pk for p in reversed(self.proposals)])
+        # NDJSON isn't opened by spreadsheets: values go out as written
+        self.assertEqual(records[1]['cover_letter'], '=HYPERLINK("http://evil.example")')
+        self.assertEqual(records[0]['username'], 'f2')
+
+    def test_export_errors(self):
+        self.assertEqual(self.export('xml').status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/jobs/0/proposals/export.csv').status_code, 404)
+        self.client.force_authenticate(User.objects.create(email='other@example.com', username='other',
+                                                           role='employer'))
+        self.assertEqual(self.export('csv').status_code, 403)
+
+
+# -----------------------------
+# Keyset pagination
+# -----------------------------
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        jobs = JobPost.objects.bulk_create([
+            JobPost(employer=self.employer, title=f'Job {i}', description='Build things',
+                    required_skills='python', budget=100)
+            for i in range(7)
+        ])
+        # Ties on created_at, in the middle of a page and across a page boundary
+        start = timezone.now() - timedelta(days=1)
+        for job, offset in zip(jobs, [2, 3, 2, 0, 1, 2, 1]):
+            JobPost.objects.filter(pk=job.pk).update(created_at=start + timedelta(minutes=offset))
+        self.job_order = list(
+            JobPost.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+        self.assertNotEqual(self.job_order, sorted(self.job_order, reverse=True))
+
+        job = jobs[0]
+        self.room = ChatRoom.objects.create(job=job, employer=self.employer, freelancer=freelancer)
+        self.messages = [
+            Message.objects.create(room=self.room, sender=freelancer, content=f'm{i}').pk for i in range(5)
+        ]
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return response.json()
+
+    def walk(self, url, link):
+        """Follow `link` ('next' or 'previous') from `url`; returns the pages' ids in the order visited."""
+        pages = []
+        while url:
+            page = self.get(url)
+            pages.append([row['id'] for row in page['results']])
+            url = page[link]
+        return pages
+
+    def test_jobs_forward_and_back(self):
+        pages = self.walk('/api/v1/jobs/?cursor=&page_size=3', 'next')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.job_order)
+
+        # From the last page back to the first, every page comes out the same
+        last = self.get('/api/v1/jobs/?cursor=&page_size=3')
+        while last['next']:
+            last = self.get(last['next'])
+        back = self.walk(last['previous'], 'previous')
+        self.assertEqual(back, pages[-2::-1])
+        self.assertIsNone(self.get('/api/v1/jobs/?cursor=&page_size=3')['previous'])
+
+    def test_messages_start_from_the_end(self):
+        url = f'/api/v1/chat/rooms/{self.room.pk}/messages/'
+        self.client.force_authenticate(self.employer)
+        latest = self.get(f'{url}?cursor=&page_size=2')
+        self.assertEqual([row['id'] for row in latest['results']], self.messages[-2:])
+        self.assertIsNone(latest['next'])
+
+        pages = self.walk(latest['previous'], 'previous')
+        self.assertEqual(pages, [self.messages[1:3], self.messages[:1]])
+        # ...and forward again from the oldest page
+        oldest = self.get(self.get(latest['previous'])['previous'])
+        self.assertEqual(self.walk(oldest['next'], 'next'), [self.messages[1:3], self.messages[3:]])
+
+        # Without a cursor the whole history comes back unpaginated
+        self.assertEqual([row['id'] for row in self.get(url)], self.messages)
+
+    def test_page_numbers_without_cursor_or_with_search(self):
+        page = self.get('/api/v1/jobs/?page_size=3')
+        self.assertEqual((page['count'], len(page['results'])), (7, 3))
+        page = self.get('/api/v1/jobs/?cursor=&search=job')
+        self.assertEqual(page['count'], 7)
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-base64!', 'eyJ2IjogMX0=', 'eyJ2IjogImJhZCIsICJpZCI6IDEsICJkIjogIm4ifQ=='):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f'/api/v1/jobs/?cursor={cursor}').status_code, 404)
+
+
+# -----------------------------
+# Versioned response cache
+# -----------------------------
+class JobListCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                          required_skills='python', budget=100)
+
+    def test_anonymous_hit_only_reads_counters(self):
+        self.assertEqual(self.client.get('/api/v1/jobs/')['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/jobs/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        sql, = [query['sql'] for query in queries]
+        self.assertIn('"api_jobpost"."proposal_count"', sql)
+        self.assertNotIn('"api_jobpost"."description"', sql)
+
+    def test_job_changes_invalidate_on_commit(self):
+        self.client.get('/api/v1/jobs/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Renamed'
+            self.job.save()
+            # Not committed yet: the old listing is still the one to serve
+            self.assertEqual(self.client.get('/api/v1/jobs/')['X-Cache'], 'HIT')
+        response = self.client.get('/api/v1/jobs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['title'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+        self.assertEqual(self.client.get('/api/v1/jobs/').json()['count'], 0)
+
+    def test_evicted_version_starts_afresh(self):
+        self.client.get('/api/v1/jobs/')
+        cache.delete(version_key('jobs'))
+        self.assertEqual(self.client.get('/api/v1/jobs/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/v1/jobs/')['X-Cache'], 'HIT')
+
+    def test_proposal_counters_are_live_on_hits(self):
+        self.client.get('/api/v1/jobs/')
+        self.client.get(f'/api/v1/jobs/employer/{self.employer.pk}/')
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal = Proposal.objects.create(job=self.job, freelancer=freelancer, cover_letter='Hire me')
+            set_score_state(proposal.pk, 'done', 80.0)
+
+        response = self.client.get('/api/v1/jobs/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        job, = response.json()['results']
+        self.assertEqual((job['proposal_count'], job['shortlisted_count'], job['avg_score']), (1, 0, 80.0))
+
+        self.client.force_authenticate(self.employer)
+        self.client.patch(f'/api/v1/jobs/{self.job.pk}/proposals/status/', {'updates': [
+            {'id': proposal.pk, 'status': 'rejected'},
+        ]}, format='json')
+        self.client.force_authenticate(None)
+        response = self.client.get(f'/api/v1/jobs/employer/{self.employer.pk}/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()[0]['proposal_count'], 1)
+
+    def test_counter_writes_keep_hits_without_going_stale(self):
+        self.client.get('/api/v1/jobs/')
+        version = cache.get(version_key('jobs'))
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        Proposal.objects.bulk_create([
+            Proposal(job=self.job, freelancer=freelancer, cover_letter='Hire me', status='shortlisted',
+                     score=60.0, score_status='done'),
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            job_stats.apply_deltas(self.job.pk, proposal_count=3)
+        response = self.client.get('/api/v1/jobs/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['results'][0]['proposal_count'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('repair_job_stats', stdout=io.StringIO())
+        self.assertEqual(cache.get(version_key('jobs')), version)
+        response = self.client.get('/api/v1/jobs/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        job, = response.json()['results']
+        self.assertEqual((job['proposal_count'], job['shortlisted_count'], job['avg_score']), (1, 1, 60.0))
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.employer)
+        self.assertNotIn('X-Cache', self.client.get('/api/v1/jobs/'))
+
+
+# -----------------------------
+# Full-text job search
+# -----------------------------
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Exercises the SQLite FTS5 backend')
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.client.force_authenticate(self.employer)  # not the anonymous response cache
+
+    def make_job(self, title, description='Build things', required_skills='python'):
+        return JobPost.objects.create(employer=self.employer, title=title, description=description,
+                                      required_skills=required_skills, budget=100)
+
+    def search(self, terms):
+        response = self.client.get('/api/v1/jobs/', {'search': terms})
+        self.assertEqual(response.status_code, 200)
+        return [job['title'] for job in response.json()['results']]
+
+    def test_triggers_keep_index_in_sync(self):
+        job = self.make_job('Kotlin developer')
+        self.assertEqual(self.search('kotlin'), ['Kotlin developer'])
+
+        job.title = 'Swift developer'
+        job.save()
+        self.assertEqual(self.search('kotlin'), [])
+        self.assertEqual(self.search('swift'), ['Swift developer'])
+
+        job.delete()
+        self.assertEqual(self.search('swift'), [])
+
+    def test_ranks_title_above_description(self):
+        self.make_job('Data engineer', description='Pipelines with rust and kafka', required_skills='sql')
+        self.make_job('Rust backend engineer', description='Build services', required_skills='sql')
+        self.make_job('Web designer', description='Figma and css', required_skills='rust')
+        self.assertEqual(self.search('rust'), ['Rust backend engineer', 'Web designer', 'Data engineer'])
+
+    def test_prefix_and_quoted_terms(self):
+        self.make_job('Django developer')
+        self.assertEqual(self.search('djan'), ['Django developer'])
+        # FTS syntax in user input is matched as text, not parsed
+        self.assertEqual(self.search('"django" OR NEAR('), [])
+
+    def test_availability_is_rechecked_until_found(self):
+        self.addCleanup(setattr, SqliteFTSBackend, '_available', True)
+        SqliteFTSBackend._available = False
+        self.make_job('Elixir developer')
+        self.assertEqual(self.search('elixir'), ['Elixir developer'])
+        self.assertTrue(SqliteFTSBackend._available)
+
+
+# -----------------------------
+# In-memory job and candidate indexes
+# -----------------------------
+class RecommendedJobsTests(TestCase):
+
+    def setUp(self):
+        open_jobs.reset()  # per-process index: drop what earlier tests loaded
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        ResumeProfile.objects.bulk_create([
+            ResumeProfile(user=self.freelancer, skills='python, django', skill_tokens=['python', 'django', 'sql'])
+        ])
+        self.client.force_authenticate(self.freelancer)
+
+    def make_job(self, title, skills, status='Open'):
+        return JobPost.objects.create(employer=self.employer, title=title, description='Build things',
+                                      required_skills=skills, budget=100, status=status)
+
+    def recommended(self, limit=10):
+        response = self.client.get(f'/api/v1/jobs/recommended/?limit={limit}')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return [(job['title'], job['match_score']) for job in response.json()]
+
+    def test_best_match_first(self):
+        self.make_job('Full match', 'python, django')
+        self.make_job('Half match', 'python, react')
+        self.make_job('No match', 'swift')
+        self.make_job('Closed', 'python', status='Closed')
+        self.assertEqual(self.recommended(), [('Full match', 100.0), ('Half match', 50.0)])
+        self.assertEqual(self.recommended(limit=1), [('Full match', 100.0)])
+
+    def test_picks_up_changes(self):
+        job = self.make_job('Job', 'python')
+        self.assertEqual(self.recommended(), [('Job', 100.0)])
+        job.status = 'Closed'
+        job.save()
+        self.assertEqual(self.recommended(), [])
+
+    def test_deleted_jobs_are_dropped_and_backfilled(self):
+        # A delete leaves no updated_at trace: the index only learns of it from the lookup,
+        # and drops the job while the ranking generator is still open
+        gone = self.make_job('Gone', 'python, django')
+        self.make_job('Kept', 'python, react')
+        self.recommended()
+        gone.delete()
+        self.assertEqual(self.recommended(limit=1), [('Kept', 50.0)])
+        self.assertNotIn(gone.pk, open_jobs.job_skills)
+
+    def test_quiet_table_reindexes_nothing(self):
+        job = self.make_job('Job', 'python')
+        JobPost.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        open_jobs.sync()
+        # Only the delta query: the job fell out of SYNC_OVERLAP before the last read
+        with CaptureQueriesContext(connection) as queries:
+            open_jobs.sync()
+        self.assertEqual(len(queries), 1)
+
+        job.required_skills = 'python, django'
+        job.save()
+        self.assertEqual(self.recommended(), [('Job', 100.0)])
+
+
+class JobCandidatesTests(TestCase):
+
+    def setUp(self):
+        resume_matrix.reset()
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                          required_skills='python, django', budget=100)
+        self.client.force_authenticate(self.employer)
+
+    def make_freelancer(self, name, tokens):
+        user = User.objects.create(email=f'{name}@example.com', username=name, role='freelancer')
+        # bulk_create skips ResumeProfile.save(), so no NLP runs here
+        ResumeProfile.objects.bulk_create([ResumeProfile(user=user, skills='', skill_tokens=tokens)])
+        return user
+
+    def candidates(self, page_size=10):
+        response = self.client.get(f'/api/v1/jobs/{self.job.pk}/candidates/?page_size={page_size}')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        data = response.json()
+        return data['count'], [(row['freelancer']['username'], row['score']) for row in data['results']]
+
+    def test_ranked_best_first(self):
+        self.make_freelancer('half', ['python'])
+        self.make_freelancer('full', ['python', 'django'])
+        self.make_freelancer('none', ['swift'])
+        self.assertEqual(self.candidates(), (2, [('full', 100.0), ('half', 50.0)]))
+
+    def test_only_the_owner(self):
+        self.client.force_authenticate(self.make_freelancer('other', []))
+        response = self.client.get(f'/api/v1/jobs/{self.job.pk}/candidates/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_edits_are_picked_up(self):
+        user = self.make_freelancer('editor', ['swift'])
+        self.assertEqual(self.candidates(), (0, []))
+        ResumeProfile.objects.filter(user=user).update(skill_tokens=['python'], updated_at=timezone.now())
+        self.assertEqual(self.candidates(), (1, [('editor', 50.0)]))
+
+    def test_deleted_profiles_leave_full_pages(self):
+        gone = self.make_freelancer('gone', ['python', 'django'])
+        self.make_freelancer('first', ['python', 'django'])
+        self.make_freelancer('second', ['python'])
+        self.candidates()
+        ResumeProfile.objects.filter(user=gone).delete()
+        self.assertEqual(self.candidates(page_size=1), (2, [('first', 100.0)]))
+
+    def test_snapshots_are_not_modified_in_place(self):
+        user = self.make_freelancer('kept', ['python'])
+        before = resume_matrix.sync()
+        resume_matrix.discard([user.pk])
+        self.assertEqual(before.rank({'python'})[0].tolist(), [user.pk])
+        self.assertEqual(resume_matrix.snapshot.rank({'python'})[0].tolist(), [])
+
+    def test_quiet_table_keeps_the_snapshot(self):
+        user = self.make_freelancer('quiet', ['python'])
+        ResumeProfile.objects.filter(user=user).update(updated_at=timezone.now() - timedelta(minutes=1))
+        before = resume_matrix.sync()
+        # The profile fell out of SYNC_OVERLAP before the last read: no overlay rebuild
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIs(resume_matrix.sync(), before)
+        self.assertEqual(len(queries), 1)
+
+        ResumeProfile.objects.filter(user=user).update(skill_tokens=['django'], updated_at=timezone.now())
+        self.assertEqual(self.candidates(), (1, [('quiet', 50.0)]))
+
+
+# -----------------------------
+# Chat inbox and read markers
+# -----------------------------
+class ChatInboxTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                     required_skills='python', budget=100)
+        self.room = ChatRoom.objects.create(job=job, employer=self.employer, freelancer=self.freelancer)
+        self.client.force_authenticate(self.employer)
+
+    def say(self, sender, content='Hello'):
+        return Message.objects.create(room=self.room, sender=sender, content=content)
+
+    def inbox(self):
+        response = self.client.get('/api/v1/chat/rooms/')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        room, = response.json()
+        return room['unread_count'], room['last_read_message_id']
+
+    def mark_read(self, data=None):
+        return self.client.post(f'/api/v1/chat/rooms/{self.room.pk}/read/', data or {}, format='json')
+
+    def test_unread_counts_only_the_other_side(self):
+        self.say(self.employer)
+        first = self.say(self.freelancer)
+        self.say(self.freelancer, 'Still there?')
+        self.assertEqual(self.inbox(), (2, 0))
+
+        self.assertEqual(self.mark_read({'message_id': first.pk}).json()['last_read_message_id'], first.pk)
+        self.assertEqual(self.inbox(), (1, first.pk))
+        self.mark_read()
+        self.assertEqual(self.inbox()[0], 0)
+
+    def test_marker_only_moves_forward(self):
+        first, last = self.say(self.freelancer), self.say(self.freelancer)
+        self.mark_read()
+        self.assertEqual(self.mark_read({'message_id': first.pk}).json()['last_read_message_id'], last.pk)
+
+    def test_marker_stops_at_the_latest_message(self):
+        last = self.say(self.freelancer)
+        response = self.mark_read({'message_id': 10 ** 12})
+        self.assertEqual(response.json()['last_read_message_id'], last.pk)
+        self.say(self.freelancer, 'New')
+        self.assertEqual(self.inbox(), (1, last.pk))
+
+    def test_only_participants(self):
+        self.client.force_authenticate(
+            User.objects.create(email='other@example.com', username='other', role='freelancer')
+        )
+        self.assertEqual(self.mark_read().status_code, 404)
+
+
+class ChatMessagePollingTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        job = JobPost.objects.create(employer=employer, title='Job', description='Build things',
+                                     required_skills='python', budget=100)
+        self.room = ChatRoom.objects.create(job=job, employer=employer, freelancer=freelancer)
+        self.messages = [Message.objects.create(room=self.room, sender=freelancer, content=f'm{i}') for i in range(3)]
+        self.url = f'/api/v1/chat/rooms/{self.room.pk}/messages/'
+        self.client.force_authenticate(employer)
+
+    def test_after(self):
+        response = self.client.get(f'{self.url}?after={self.messages[0].pk}')
+        self.assertEqual([message['content'] for message in response.json()], ['m1', 'm2'])
+
+    def test_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Message.objects.create(room=self.room, sender=self.room.employer, content='new')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_wait_returns_what_is_already_there(self):
+        started = time.monotonic()
+        response = self.client.get(f'{self.url}?after={self.messages[1].pk}&wait=5')
+        self.assertEqual([message['content'] for message in response.json()], ['m2'])
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_wait_times_out(self):
+        started = time.monotonic()
+        response = self.client.get(f'{self.url}?after={self.messages[2].pk}&wait=0.2')
+        self.assertEqual(response.json(), [])
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertNotIn('Retry-After', response)
+
+    def test_busy_answers_at_once(self):
+        held = 0
+        while waiter_slots.acquire(blocking=False):
+            held += 1
+        try:
+            started = time.monotonic()
+            response = self.client.get(f'{self.url}?after={self.messages[2].pk}&wait=5')
+        finally:
+            for _ in range(held):
+                waiter_slots.release()
+        self.assertEqual(response.json(), [])
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertIn('Retry-After', response)
+
+
+class ChatWebSocketTests(TestCase):
+    """ChatConsumer through the full ASGI stack: origin check, ?token= auth and routing."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        self.freelancer = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+        job = JobPost.objects.create(employer=self.employer, title='Job', description='Build things',
+                                     required_skills='python', budget=100)
+        self.room = ChatRoom.objects.create(job=job, employer=self.employer, freelancer=self.freelancer)
+
+    def socket(self, user=None, room=None, token=None):
+        if token is None and user is not None:
+            token = AccessToken.for_user(user)
+        path = f'/ws/chat/{(room or self.room).pk}/' + (f'?token={token}' if token else '')
+        return WebsocketCommunicator(application, path, headers=[(b'origin', b'http://localhost')])
+
+    def test_rejects_anonymous_and_outsiders(self):
+        outsider = User.objects.create(email='outsider@example.com', username='outsider', role='freelancer')
+
+        async def connect(communicator):
+            connected, code = await communicator.connect()
+            await communicator.disconnect()
+            return connected, code
+
+        for name, communicator in [
+            ('no token', self.socket()),
+            ('bad token', self.socket(token='not-a-jwt')),
+            ('outsider', self.socket(outsider)),
+        ]:
+            with self.subTest(name):
+                self.assertEqual(async_to_sync(connect)(communicator), (False, 4403))
+
+    def test_messages_reach_both_participants(self):
+        employer, freelancer = self.socket(self.employer), self.socket(self.freelancer)
+
+        async def exchange():
+            self.assertTrue((await employer.connect())[0])
+            self.assertTrue((await freelancer.connect())[0])
+            try:
+                await freelancer.send_json_to({'content': '   '})
+                self.assertEqual(await freelancer.receive_json_from(), {'error': 'content is required'})
+                await freelancer.send_json_to(['not', 'an', 'object'])
+                self.assertEqual(await freelancer.receive_json_from(), {'error': 'content is required'})
+
+                await freelancer.send_json_to({'content': 'Hello'})
+                for communicator in (employer, freelancer):
+                    message = await communicator.receive_json_from()
+                    self.assertEqual((message['content'], message['sender']), ('Hello', self.freelancer.pk))
+            finally:
+                await employer.disconnect()
+                await freelancer.disconnect()
+
+        async_to_sync(exchange)()
+        self.assertEqual(list(Message.objects.values_list('content', flat=True)), ['Hello'])
+
+    def test_http_posts_fan_out_to_sockets(self):
+        self.client.force_authenticate(self.employer)
+
+        communicator = self.socket(self.freelancer)
+
+        async def post_and_receive():
+            self.assertTrue((await communicator.connect())[0])
+            try:
+                response = await sync_to_async(self.client.post)(
+                    f'/api/v1/chat/rooms/{self.room.pk}/messages/', {'content': 'Over HTTP'}, format='json',
+                )
+                self.assertEqual(response.status_code, 201, response.content[:500])
+                message = await communicator.receive_json_from()
+                self.assertEqual((message['id'], message['content']), (response.json()['id'], 'Over HTTP'))
+                self.assertTrue(await communicator.receive_nothing())
+            finally:
+                await communicator.disconnect()
+
+        async_to_sync(post_and_receive)()
+
+
+# -----------------------------
+# Query plans for hot queries
+# -----------------------------
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is SQLite-specific')
+class QueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on the queries behind the busiest endpoints and
+    fails if one reads a whole table instead of searching an index, or sorts
+    its rows in a temporary B-tree instead of reading them in index order.
+    """
+
+    FULL_SCAN = re.compile(r'\bSCAN (api_\w+)(?! USING (?:COVERING )?INDEX)')
+
+    def assertIndexed(self, queryset, sorted_by_index=True):
+        plan = queryset.explain()
+        self.assertIsNone(self.FULL_SCAN.search(plan), f"Full table scan:\n{plan}")
+        if sorted_by_index:
+            self.assertNotIn('TEMP B-TREE', plan, f"Sorted outside an index:\n{plan}")
+
+    def test_open_jobs(self):
+        queryset = JobPost.objects.filter(status='Open').select_related('employer')
+        self.assertIndexed(queryset.order_by('-created_at'))
+        self.assertIndexed(queryset.order_by('-created_at', '-id'))
+
+    def test_open_jobs_keyset_page(self):
+        paginator = JobPagination()
+        paginator.field_name = 'created_at'
+        queryset = JobPost.objects.filter(status='Open').order_by(*paginator.ordering)
+        position = ('2024-01-01T00:00:00+00:00', 10)
+        self.assertIndexed(queryset.filter(paginator.seek_filter(position, forward=True)))
+
+    def test_employer_jobs(self):
+        self.assertIndexed(JobPost.objects.filter(employer__id=1).select_related('employer'))
+
+    def test_freelancer_proposals(self):
+        self.assertIndexed(Proposal.objects.filter(freelancer=1).select_related('freelancer__resume'))
+
+    def test_job_proposals(self):
+        self.assertIndexed(
+            Proposal.objects.filter(job=1).select_related('freelancer__resume').order_by('-submitted_at')
+        )
+        self.assertIndexed(Proposal.objects.filter(job=1, status='shortlisted').order_by())
+
+    def test_shortlisted_check(self):
+        # get_or_create_chat_room
+        self.assertIndexed(Proposal.objects.filter(job=1, freelancer=2, status='shortlisted').order_by())
+
+    def test_chat_rooms(self):
+        rooms = ChatRoom.objects.filter(Q(employer=1) | Q(freelancer=1)).select_related('job')
+        self.assertIndexed(rooms)
+        # The inbox orders by latest activity, which no index holds; every subquery must still seek
+        user = User.objects.create(email='inbox@example.com', username='inbox')
+        self.assertIndexed(annotate_inbox(rooms, user), sorted_by_index=False)
+
+    def test_room_messages(self):
+        self.assertIndexed(Message.objects.filter(room_id=1).select_related('sender').order_by('timestamp', 'id'))
+        # ?after= walks the rowid range of the room instead; the few new rows are sorted in memory
+        self.assertIndexed(Message.objects.filter(room_id=1, id__gt=5).order_by('timestamp', 'id'),
+                           sorted_by_index=False)
+
+    def test_room_state(self):
+        with CaptureQueriesContext(connection) as queries:
+            room_state(1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+            plan = "\n".join(str(row) for row in cursor.fetchall())
+        self.assertIsNone(self.FULL_SCAN.search(plan), f"Full table scan:\n{plan}")
+
+
+# -----------------------------
+# JWT authentication from token claims
+# -----------------------------
+class ClaimsAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create(email='freelancer@example.com', username='freelancer', role='freelancer')
+
+    def get(self, url, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return [query['sql'] for query in queries]
+
+    def user_queries(self, queries):
+        return [sql for sql in queries if 'FROM "api_user"' in sql]
+
+    def test_reads_build_the_user_from_claims(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        queries = self.get('/api/v1/jobs/1/has-applied/', token)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_tokens_without_claims_use_the_user_cache(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(len(self.user_queries(self.get('/api/v1/jobs/1/has-applied/', token))), 1)
+        self.assertEqual(self.user_queries(self.get('/api/v1/jobs/1/has-applied/', token)), [])
+
+        # Saving the profile drops the cached row
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.client.put('/api/v1/profile/', {'full_name': 'Renamed'}, format='json')
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_deactivated_users_lose_personal_data_at_once(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.user.is_active = False
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for url in ('/api/v1/proposals/freelancer/', '/api/v1/jobs/1/proposals/', '/api/v1/jobs/1/proposals/export.csv',
+                    '/api/v1/jobs/1/candidates/', '/api/v1/chat/rooms/', '/api/v1/chat/rooms/1/messages/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 401)
+        # Views without other people's data still trust the token's claims
+        self.assertEqual(self.client.get('/api/v1/jobs/1/has-applied/').status_code, 200)
+
+    def test_writes_load_the_user(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/api/v1/jobs/', {}, format='json')
+        self.assertEqual(len(self.user_queries([query['sql'] for query in queries])), 1)
+
+
+# -----------------------------
+# Request profiling and /metrics
+# -----------------------------
+class ProfilingTests(TestCase):
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/v1/jobs/')
+        entries = {entry.split(';')[0] for entry in response['Server-Timing'].split(', ')}
+        self.assertLessEqual({'db', 'render', 'total'}, entries)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_hidden_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_the_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        self.client.get('/api/v1/jobs/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('http_requests_total{', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_streaming_responses_have_no_size(self):
+        fresh = metrics.Registry()  # the process-wide one holds other tests' export requests
+        for module in (metrics, middleware):
+            self.addCleanup(setattr, module, 'registry', module.registry)
+            module.registry = fresh
+        employer = User.objects.create(email='employer@example.com', username='employer', role='employer')
+        job = JobPost.objects.create(employer=employer, title='Job', description='Build things',
+                                     required_skills='python', budget=100)
+        client = APIClient()
+        client.force_authenticate(employer)
+        response = client.get(f'/api/v1/jobs/{job.pk}/proposals/export.csv')
+        self.assertTrue(response.streaming)
+        b''.join(response.streaming_content)
+
+        lines = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode().splitlines()
+        export = [line for line in lines if 'proposals/export' in line]
+        self.assertTrue(any(line.startswith('http_requests_total{') for line in export))
+        self.assertFalse(any(line.startswith('http_response_size_bytes') for line in export))
+
+
+# -----------------------------
+# Benchmark seeder and runner
+# -----------------------------
+class BenchmarkSmokeTests(TestCase):
+    """The benchmark suite must keep working as endpoints change: every scenario answers 200."""
+
+    def test_seed_and_run(self):
+        call_command(
+            'seed_benchmark_data', employers=2, freelancers=10, jobs=5, proposals_per_job=4,
+            rooms=3, messages_per_room=3, stdout=io.StringIO(),
+        )
+        self.assertEqual(Proposal.objects.count(), 20)
+        self.assertEqual(sum(JobPost.objects.values_list('proposal_count', flat=True)), 20)
+
+        report = run_benchmarks(build_scenarios(), iterations=1, warmup=0)
+        failing = {name: result['status'] for name, result in report['scenarios'].items() if result['status'] != 200}
+        self.assertEqual(failing, {})
+        self.assertEqual(compare(report, report, threshold=0.25), [])
+
+    def test_engine_hooks_see_every_stage(self):
+        seen = []
+        engine = MatchingEngine(
+            hooks=[lambda stage, seconds: seen.append(stage)],
+            extract=lambda data: data.decode(),
+            tokenize=word_tokens,
+        )
+        scores = engine.match(b"Shipped Django and REST API work", [{'django', 'rest api'}, {'flask'}])
+        self.assertEqual(scores, [100.0, 0])
+        self.assertEqual(seen, ['pdf', 'nlp', 'score'])
+
+    def test_matching_benchmark(self):
+        report = run_matching_benchmark(resumes=2, jobs=5, pages=(1, 2), tokenizer='words', pdf='inline', warmup=1)
+        self.assertEqual(set(report['buckets']), {'pages_1', 'pages_2'})
+        for result in report['buckets'].values():
+            self.assertEqual(result['documents'], 2)
+            self.assertEqual(set(result['stages']), set(MatchingEngine.STAGES))
+            self.assertGreater(result['python_heap_peak_kb'], 0)
+        self.assertEqual(compare_matching(report, report, threshold=0.25), [])
+
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({'seconds': time.perf_counter() - started, 'modules': sorted(sys.modules)}))
+"""
+
+
+class StartupImportTests(SimpleTestCase):
+    """What every worker boot and manage.py command pays: django.setup() plus URL loading."""
+    HEAVY_MODULES = {'spacy', 'thinc', 'numpy', 'fitz', 'twisted'}
+
+    def measure(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='core.settings')
+        env.pop('NLP_PRELOAD', None)
+        env.pop('ASGI_RUNSERVER', None)
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout)
+
+    def test_heavy_libraries_load_on_first_use(self):
+        self.assertEqual(self.HEAVY_MODULES & set(self.measure()['modules']), set())
+
+    # Wall-clock time depends on the machine, so only checked where a budget is set
+    @unittest.skipUnless(os.environ.get('STARTUP_BUDGET_SECONDS'), 'STARTUP_BUDGET_SECONDS is not set')
+    def test_startup_time_budget(self):
+        # Best of three fresh interpreters, so one slow run on a busy machine doesn't fail it
+        seconds = min(self.measure()['seconds'] for _ in range(3))
+        self.assertLess(seconds, float(os.environ['STARTUP_BUDGET_SECONDS']))
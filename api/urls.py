@@ -5,6 +5,7 @@ from .views import (
     JobPostView,
     ProposalView,
     ChatRoomView,
+    ChatRoomReadView,
     MessageListCreateView,
     CustomTokenObtainPairView,
     EmployerJobListView,
@@ -14,7 +15,11 @@ from .views import (
     HasAppliedProposalView,
     JobProposalListView,
     ProposalUpdateStatusView, 
+    JobProposalBulkStatusView,
+    JobProposalExportView,
     FreelancerProposalsView,
+    RecommendedJobsView,
+    JobCandidatesView,
 )
 from .views import get_or_create_chat_room
 
@@ -35,6 +40,7 @@ urlpatterns = [
 
     # 📌 Job Posts
     path('jobs/', JobPostView.as_view(), name='job_list_create'),
+    path('jobs/recommended/', RecommendedJobsView.as_view(), name='job-recommended'),
     path('jobs/employer/<int:employer_id>/', EmployerJobListView.as_view()),
     path('jobs/<int:pk>/', JobDetailView.as_view(), name='job-detail'),
     
@@ -43,6 +49,9 @@ urlpatterns = [
     path('proposals/', ProposalView.as_view(), name='proposal_list_create'),
     path('jobs/<int:job_id>/has-applied/', HasAppliedProposalView.as_view(), name='has-applied'),
     path('jobs/<int:job_id>/proposals/', JobProposalListView.as_view(), name='job-proposals'),
+    path('jobs/<int:job_id>/proposals/export.<str:export_format>', JobProposalExportView.as_view(), name='job-proposals-export'),
+    path('jobs/<int:job_id>/proposals/status/', JobProposalBulkStatusView.as_view(), name='job-proposals-bulk-status'),
+    path('jobs/<int:job_id>/candidates/', JobCandidatesView.as_view(), name='job-candidates'),
     path('proposals/<int:pk>/update/', ProposalUpdateStatusView.as_view(), name='update-proposal'),
     path('proposals/freelancer/', FreelancerProposalsView.as_view(), name='freelancer-proposals'),
 
@@ -51,6 +60,7 @@ urlpatterns = [
 
     # 💬 Messaging
     path('chat/rooms/', ChatRoomView.as_view(), name='chat-rooms'),
+    path('chat/rooms/<int:room_id>/read/', ChatRoomReadView.as_view(), name='chat-room-read'),
     path('chat/rooms/<int:room_id>/messages/', MessageListCreateView.as_view(), name='chat-messages'),
     path('chat/start/', get_or_create_chat_room, name='start-chat'),
 
@@ -1,7 +1,7 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import generics, permissions, viewsets, status, filters, serializers
+from rest_framework import generics, permissions, viewsets, status, serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import User, ResumeProfile, JobPost, Proposal, Message, ChatRoom
@@ -13,16 +13,35 @@ from .serializers import (
     MessageSerializer,
     CustomTokenObtainPairSerializer,
     ProfileUpdateSerializer,
-    ChatRoomSerializer
+    ChatRoomSerializer,
+    RecommendedJobSerializer,
+    CandidateSerializer,
+    BulkProposalStatusSerializer,
+    ChatInboxSerializer,
+    ReadMarkerSerializer,
 )
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.exceptions import PermissionDenied
-import fitz  # PyMuPDF
-import spacy
+from rest_framework.exceptions import NotFound, PermissionDenied
+from .authentication import ClaimsJWTAuthentication
+from .cache import VersionedResponseCacheMixin
+from .chat import annotate_inbox, mark_room_read, notify_new_message, room_etag, room_state, wait_for_message
+from .export import EXPORT_FORMATS, proposal_rows
+from .job_index import recommend_jobs
+from .job_stats import apply_deltas, overlay_job_stats
+from .matching import parse_skills
+from .pagination import KeysetPagination
+from .search import JobSearchFilter
+from .tasks import enqueue_scoring
 from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -72,31 +91,78 @@ class ResumeDetailView(generics.RetrieveUpdateAPIView):
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
 
-class JobPagination(PageNumberPagination):
+class JobPageNumberPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'page_size'
 
-class JobPostView(generics.ListCreateAPIView):
+class JobPagination(KeysetPagination):
+    """Keyset pages over (created_at, id) with ?cursor=; page numbers otherwise."""
+    ordering = ('-created_at', '-id')
+    page_size = 6
+    fallback_class = JobPageNumberPagination
+
+    def use_keyset(self, request):
+        # Search results are ordered by relevance, not by the keyset
+        return super().use_keyset(request) and not request.query_params.get('search')
+
+class JobListCacheMixin(VersionedResponseCacheMixin):
+    """Job listings stay cached until a job changes; proposal counters are read live on every hit."""
+    cache_namespace = 'jobs'
+
+    def overlay_cached_data(self, data):
+        overlay_job_stats(data['results'] if isinstance(data, dict) else data)
+        return data
+
+class JobPostView(JobListCacheMixin, generics.ListCreateAPIView):
     serializer_class = JobPostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    authentication_classes = [ClaimsJWTAuthentication]  # ✅ no user query on reads
     pagination_class = JobPagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'required_skills', 'description']
+    filter_backends = [JobSearchFilter]
+    search_fields = ['title', 'required_skills', 'description']  # used by the LIKE fallback
 
     def get_queryset(self):
-        return JobPost.objects.filter(status='Open').order_by('-created_at')
+        queryset = JobPost.objects.filter(status='Open').select_related('employer').order_by('-created_at')
+
+        # ?skill=django,react → jobs needing any of these skills (index lookup on the skill join table)
+        skill = self.request.query_params.get('skill')
+        if skill:
+            queryset = queryset.filter(pk__in=JobPost.skill_tags.through.objects.filter(
+                skill__name__in=parse_skills(skill),
+            ).values('jobpost_id'))
+        return queryset
     
     def perform_create(self, serializer):
         # ✅ Attach the currently logged-in user as employer
         serializer.save(employer=self.request.user)
 
-class EmployerJobListView(generics.ListAPIView):
+class RecommendedJobsView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]  # ✅ no user query on reads
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        profile = ResumeProfile.objects.filter(user=request.user).only('skill_tokens').first()
+        if not profile or limit < 1:
+            return Response([])
+
+        jobs = recommend_jobs(set(profile.skill_tokens), limit)
+        return Response(RecommendedJobSerializer(jobs, many=True).data)
+
+class EmployerJobListView(JobListCacheMixin, generics.ListAPIView):
     serializer_class = JobPostSerializer
     permission_classes = [permissions.AllowAny]
+    authentication_classes = [ClaimsJWTAuthentication]  # ✅ no user query on reads
 
     def get_queryset(self):
         employer_id = self.kwargs['employer_id']
-        return JobPost.objects.filter(employer__id=employer_id)
+        return JobPost.objects.filter(employer__id=employer_id).select_related('employer')
     
 class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = JobPost.objects.all()
@@ -114,13 +180,6 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
 #     def perform_create(self, serializer):
 #         serializer.save(freelancer=self.request.user)
 
-def extract_text_from_pdf(pdf_file):
-        text = ""
-        with fitz.open(stream=pdf_file.read(), filetype="pdf") as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
-
 class ProposalView(generics.CreateAPIView):
     queryset = Proposal.objects.all()
     serializer_class = ProposalSerializer
@@ -129,7 +188,6 @@ class ProposalView(generics.CreateAPIView):
     def perform_create(self, serializer):
         user = self.request.user
         job_id = self.request.data.get('job')
-        nlp = spacy.load("en_core_web_sm")
 
         if user.role != 'freelancer':
             raise serializers.ValidationError("Only freelancers can apply to jobs.")
@@ -137,38 +195,10 @@ class ProposalView(generics.CreateAPIView):
         if Proposal.objects.filter(job_id=job_id, freelancer=user).exists():
             raise serializers.ValidationError("You've already submitted a proposal for this job.")
 
-        job = JobPost.objects.get(id=job_id)
-        freelancer_profile = getattr(user, 'resume', None)
-
-        if freelancer_profile:
-            # 1. Extract resume text from PDF if uploaded
-            resume_text = ""
-            if freelancer_profile.resume_file:
-                try:
-                    resume_text = extract_text_from_pdf(freelancer_profile.resume_file)
-                except Exception as e:
-                    print("Resume extraction failed:", e)
-
-            # 2. Combine all text sources
-            combined_text = " ".join([
-                freelancer_profile.skills or "",
-                freelancer_profile.experience or "",
-                freelancer_profile.education or "",
-                resume_text
-            ]).lower()
-
-            # 3. Process with spaCy NLP
-            doc = nlp(combined_text)
-            tokens = set([chunk.text.strip().lower() for chunk in doc.noun_chunks])
-
-            # 4. Compare with job skills
-            job_skills = set(s.strip().lower() for s in job.required_skills.split(',') if s)
-            matches = job_skills & tokens
-            score = (len(matches) / len(job_skills)) * 100 if job_skills else 0
-        else:
-            score = 0
-
-        serializer.save(freelancer=user, score=round(score, 2))
+        # ✅ Save right away; the scoring worker fills in the score
+        with transaction.atomic():
+            proposal = serializer.save(freelancer=user, score_status='pending')
+            enqueue_scoring(proposal)
 
 
 class FreelancerProposalsView(generics.ListAPIView):
@@ -176,12 +206,13 @@ class FreelancerProposalsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Proposal.objects.filter(freelancer=self.request.user).select_related('job')
+        return Proposal.objects.filter(freelancer=self.request.user).select_related('freelancer__resume')
 
 
 
 class HasAppliedProposalView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]  # ✅ no user query on reads
 
     def get(self, request, job_id):
         user = request.user
@@ -198,12 +229,76 @@ class JobProposalListView(generics.ListAPIView):
         job = JobPost.objects.get(id=job_id)
 
         # ✅ Only the employer who owns the job can view proposals
-        if self.request.user != job.employer:
+        if self.request.user.id != job.employer_id:
             raise PermissionDenied("You do not have permission to view proposals for this job.")
 
-        return Proposal.objects.filter(job=job).order_by('-submitted_at')
+        return Proposal.objects.filter(job=job).select_related('freelancer__resume').order_by('-submitted_at')
     
 
+class JobProposalExportView(APIView):
+    """GET .../proposals/export.csv or export.ndjson: every proposal of the job, streamed."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body isn't rendered by DRF, so don't 406 on "Accept: text/csv"
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, job_id, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound(f"Unknown export format '{export_format}'.")
+        job = generics.get_object_or_404(JobPost.objects.only('id', 'employer_id'), pk=job_id)
+
+        # ✅ Only the employer who owns the job can export its proposals
+        if request.user.id != job.employer_id:
+            raise PermissionDenied("You do not have permission to export proposals for this job.")
+
+        stream, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream(proposal_rows(job.pk)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="job-{job.pk}-proposals.{export_format}"'
+        return response
+
+
+class CandidatePagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class JobCandidatesView(generics.ListAPIView):
+    """Every freelancer ranked against a job's required skills, whether or not they applied."""
+    serializer_class = CandidateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CandidatePagination
+
+    def list(self, request, *args, **kwargs):
+        from .candidate_index import rank_candidates, resume_matrix  # ✅ numpy loads on first use
+
+        job = generics.get_object_or_404(JobPost.objects.only('id', 'employer_id'), pk=self.kwargs['job_id'])
+
+        # ✅ Only the employer who owns the job can search candidates
+        if request.user.id != job.employer_id:
+            raise PermissionDenied("You do not have permission to view candidates for this job.")
+
+        skills = job.skill_names()
+        while True:
+            page = self.paginate_queryset(rank_candidates(skills))
+            profiles = ResumeProfile.objects.select_related('user').in_bulk(
+                [user_id for user_id, _ in page], field_name='user_id',
+            )
+            missing = [user_id for user_id, _ in page if user_id not in profiles]
+            if not missing:
+                break
+            # ✅ Deleted since the matrix was built: forget them and rank again, so the
+            # page is full and the count is right (each pass drops at least one id)
+            resume_matrix.discard(missing)
+
+        candidates = []
+        for user_id, score in page:
+            profile = profiles[user_id]
+            profile.score = score
+            candidates.append(profile)
+        return self.get_paginated_response(self.get_serializer(candidates, many=True).data)
+
+
 class ProposalUpdateStatusView(generics.UpdateAPIView):
     queryset = Proposal.objects.all()
     serializer_class = ProposalSerializer
@@ -215,11 +310,64 @@ class ProposalUpdateStatusView(generics.UpdateAPIView):
         if request.user != proposal.job.employer:
             raise PermissionDenied("You do not have permission to update this proposal.")
 
-        print("PATCH received:", request.data)  # DEBUG
+        logger.debug("Proposal %s status update: %s", proposal.pk, request.data)
 
         return self.partial_update(request, *args, **kwargs)
 
 
+class JobProposalBulkStatusView(APIView):
+    """
+    PATCH {"updates": [{"id": <proposal id>, "status": "shortlisted"}, ...]}
+
+    Applies every change in one transaction. The job ends up in the status the
+    last shortlist/reject in the list would have given it had the proposals
+    been updated one by one, but is saved only once.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def patch(self, request, job_id):
+        job = generics.get_object_or_404(JobPost.objects.only('id', 'employer_id', 'status'), pk=job_id)
+
+        # ✅ Only the employer who owns the job can update its proposals
+        if request.user.id != job.employer_id:
+            raise PermissionDenied("You do not have permission to update proposals for this job.")
+
+        serializer = BulkProposalStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updates = serializer.validated_data['updates']
+
+        with transaction.atomic():
+            proposals = Proposal.objects.filter(job=job).select_for_update().only('id', 'status').in_bulk(
+                [update['id'] for update in updates],
+            )
+            missing = [update['id'] for update in updates if update['id'] not in proposals]
+            if missing:
+                return Response(
+                    {'detail': "Proposals not found for this job.", 'ids': missing},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            changed = []
+            shortlisted = 0
+            job_status = job.status
+            for update in updates:
+                proposal = proposals[update['id']]
+                job_status = Proposal.JOB_STATUS_FOR.get(update['status'], job_status)
+                if proposal.status != update['status']:
+                    shortlisted += (update['status'] == 'shortlisted') - (proposal.status == 'shortlisted')
+                    proposal.status = update['status']
+                    changed.append(proposal)
+            Proposal.objects.bulk_update(changed, ['status'])
+            apply_deltas(job.pk, shortlisted_count=shortlisted)
+
+            if job_status != job.status:
+                job.status = job_status
+                job.save(update_fields=['status'])
+
+        logger.debug("Job %s: %d proposal status changes", job.pk, len(changed))
+        return Response({'updated': len(changed), 'job_status': job.status})
+
+
 class ChatRoomView(generics.ListCreateAPIView):
     queryset = ChatRoom.objects.all()
     serializer_class = ChatRoomSerializer
@@ -227,25 +375,121 @@ class ChatRoomView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return ChatRoom.objects.filter(Q(employer=user) | Q(freelancer=user))
+        rooms = ChatRoom.objects.filter(Q(employer=user) | Q(freelancer=user)).select_related('job')
+        if self.request.method == 'GET':
+            # ✅ Inbox: last message + unread count per room, newest activity first
+            rooms = annotate_inbox(rooms, user)
+        return rooms
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ChatInboxSerializer
+        return ChatRoomSerializer
 
     def perform_create(self, serializer):
         serializer.save()
 
 
+class ChatRoomReadView(APIView):
+    """POST {"message_id": <id>} (or nothing for "everything so far") marks the room read up to there."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, room_id):
+        user = request.user
+        room = generics.get_object_or_404(
+            ChatRoom.objects.filter(Q(employer=user) | Q(freelancer=user)).only('id'), pk=room_id,
+        )
+        serializer = ReadMarkerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marker = mark_room_read(room.id, user, serializer.validated_data.get('message_id'))
+        return Response({'room': room.id, 'last_read_message_id': marker.last_read_message_id})
+
+
+class MessagePagination(KeysetPagination):
+    """
+    ?cursor= returns the latest page_size messages (oldest first); follow
+    `previous` to scroll back and `next` to load newer ones.
+    Without a cursor the full history is returned, as before.
+    """
+    ordering = ('timestamp', 'id')
+    page_size = 50
+    start_from_end = True
+
 class MessageListCreateView(generics.ListCreateAPIView):
+    """
+    Extra GET parameters for polling clients:
+      ?after=<message id>  only messages newer than that id (unpaginated)
+      ?wait=<seconds>      long-poll: hold the request until something new
+                           arrives (newer than `after`, or different from the
+                           If-None-Match ETag), up to max_wait seconds; when
+                           too many requests are already waiting, answers at
+                           once with a Retry-After header
+    Every response carries an ETag; a matching If-None-Match gets a 304.
+    """
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessagePagination
+    max_wait = 30
+    busy_retry_after = 5  # seconds, when no long-poll slot is free
 
     def get_queryset(self):
         room_id = self.kwargs['room_id']
-        return Message.objects.filter(room_id=room_id).order_by('timestamp')
+        queryset = Message.objects.filter(room_id=room_id).select_related('sender').order_by('timestamp', 'id')
+        after = self.get_after()
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        return queryset
+
+    def get_after(self):
+        try:
+            return int(self.request.query_params['after'])
+        except (KeyError, ValueError):
+            return None
+
+    def paginate_queryset(self, queryset):
+        # "Messages since" responses are already small: return them as a plain list
+        if self.get_after() is not None:
+            return None
+        return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        room_id = self.kwargs['room_id']
+        query_string = request.META.get('QUERY_STRING', '')
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), self.max_wait)
+        except ValueError:
+            wait = 0
+
+        state = room_state(room_id)
+        etag = room_etag(state, query_string)
+        after = self.get_after()
+
+        unchanged = etag in if_none_match or (after is not None and state[0] <= after)
+        waited = None
+        if wait > 0 and unchanged:
+            baseline = after if after is not None and state[0] <= after else state[0]
+            waited = wait_for_message(room_id, baseline, wait)
+            if waited:
+                state = room_state(room_id)
+                etag = room_etag(state, query_string)
+
+        if etag in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        if wait > 0 and unchanged and waited is None:
+            # ✅ Every waiter slot is taken: answered without waiting, so tell the client to back off
+            response['Retry-After'] = str(self.busy_retry_after)
+        return response
 
     def perform_create(self, serializer):
-        serializer.save(
+        message = serializer.save(
             sender=self.request.user,
             room_id=self.kwargs['room_id']
         )
+        notify_new_message(message)
 
 
 
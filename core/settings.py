@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -47,10 +48,18 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
-    'rest_framework_simplejwt.token_blacklist'
+    'rest_framework_simplejwt.token_blacklist',
+    'channels',
 ]
 
+# ✅ daphne's app only swaps in its ASGI runserver (WebSocket support in development).
+# Importing it pulls in twisted, autobahn and numpy, so it is opt-in:
+# `ASGI_RUNSERVER=1 python manage.py runserver`. It must come before staticfiles.
+if os.environ.get('ASGI_RUNSERVER') == '1':
+    INSTALLED_APPS.insert(0, 'daphne')
+
 MIDDLEWARE = [
+    'api.middleware.ProfilingMiddleware', # Server-Timing header + /metrics; keep first to time everything
     'corsheaders.middleware.CorsMiddleware', # CORS middleware must be placed before SecurityMiddleware
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware", # Whitenoise middleware
@@ -81,6 +90,31 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+
+# Channel layer for WebSocket chat fan-out. In production HTTP runs under
+# gunicorn and the sockets under daphne (see README), so a message posted over
+# REST must cross processes: set CHANNEL_REDIS_URL (gunicorn.conf.py refuses to
+# start without it). The in-memory layer only reaches sockets held by the same
+# process, which covers `ASGI_RUNSERVER=1 python manage.py runserver` and tests.
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# Chat long-polls (?wait=) allowed to wait at once per process; each holds a
+# server thread (GUNICORN_THREADS per worker), so keep this well below that.
+CHAT_LONG_POLL_SLOTS = int(os.environ.get('CHAT_LONG_POLL_SLOTS', 2))
 
 
 # Database
@@ -89,11 +123,37 @@ WSGI_APPLICATION = 'core.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # SQLITE_PATH points runs such as benchmarks at a throwaway database
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
 
+# Cache
+# Local memory by default, which is per process. Cached job listings and the
+# version counters that invalidate them (api/cache.py) must be shared by every
+# process that serves or changes jobs, so with several gunicorn workers set
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://... (gunicorn.conf.py refuses to start them otherwise).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'skillmatch'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# Anonymous job listings (see api/cache.py). Entries are invalidated by version
+# bumps; the timeout only bounds how long superseded entries linger.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Users loaded by api.authentication.ClaimsJWTAuthentication for tokens without
+# role/email/username claims. Saving a user drops its entry (api/signals.py).
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -192,3 +252,22 @@ CORS_ALLOW_ALL_ORIGINS = True  # Allow all origins for CORS
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT =  BASE_DIR / 'media'
+
+# NLP (proposal scoring)
+NLP_MODEL_NAME = 'en_core_web_sm'
+# Load the model at app start instead of on first use (enabled by gunicorn.conf.py)
+NLP_PRELOAD = os.environ.get('NLP_PRELOAD') == '1'
+
+# Resume PDF extraction (api/pdf.py): a pool of PDF_WORKERS processes per web
+# process; larger, longer or slower documents are rejected
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', 2))
+PDF_TIMEOUT = 15  # seconds per document
+PDF_MAX_PAGES = 50
+PDF_MAX_BYTES = 10 * 1024 * 1024
+PDF_WORKER_MEMORY = 1024 * 1024 * 1024  # address-space cap per pool process
+
+# Job search: dotted path to a backend in api/search.py, or None to pick by database vendor
+JOB_SEARCH_BACKEND = None
+
+# Bearer token required to scrape /metrics (endpoint is disabled when unset)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
@@ -20,6 +20,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import include
 
+from api.metrics import metrics_view
+
 # Swagger imports
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -41,6 +43,9 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Prometheus metrics (see api.metrics)
+    path('metrics', metrics_view, name='metrics'),
+
       # Include your API routes
     path('api/v1/', include('api.urls')),
 
@@ -0,0 +1,36 @@
+# Gunicorn picks this file up automatically from the working directory.
+# It serves the HTTP API; WebSocket chat (/ws/) runs in a separate daphne
+# process, see "Deployment" in the README.
+import gc
+import os
+
+# Messages posted over REST in these workers are pushed to sockets held by
+# daphne through the channel layer, which must therefore be shared
+if not os.environ.get("CHANNEL_REDIS_URL"):
+    raise RuntimeError(
+        "CHANNEL_REDIS_URL is not set: chat messages posted over HTTP would never reach "
+        "WebSocket clients connected to daphne (see CHANNEL_LAYERS in core/settings.py)."
+    )
+
+# Load the Django app (and the spaCy model, via ApiConfig.ready) once in the
+# master process, then fork workers so they share the model pages copy-on-write.
+preload_app = True
+os.environ.setdefault("NLP_PRELOAD", "1")
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# On the default local-memory cache each worker would keep its own cached job
+# listings and version counters, and never see the others' invalidations
+if workers > 1 and "locmem" in os.environ.get("CACHE_BACKEND", "locmem"):
+    raise RuntimeError(
+        "Several workers need a shared cache: set CACHE_BACKEND and CACHE_LOCATION "
+        "(e.g. django.core.cache.backends.redis.RedisCache, see CACHES in core/settings.py)."
+    )
+# Threads per worker (gthread), so long-polling chat requests don't pin a whole worker;
+# at most CHAT_LONG_POLL_SLOTS of them wait at once (see core/settings.py)
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+
+def when_ready(server):
+    # Move everything loaded so far into the permanent generation so the
+    # collector in each worker doesn't touch (and copy) the shared pages.
+    gc.freeze()